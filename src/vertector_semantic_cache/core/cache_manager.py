@@ -1,11 +1,16 @@
 """Async semantic cache manager with enterprise features."""
 
 import asyncio
+import logging
 import time
-import hashlib
-import json
-from typing import Optional, Dict, Any, List
-from contextlib import asynccontextmanager
+from collections import Counter
+from typing import AsyncIterator, Optional, Dict, Any, List, Tuple, Callable
+from contextlib import asynccontextmanager, nullcontext
+
+import numpy as np
+import orjson
+import xxhash
+from cachetools import LRUCache
 
 try:
     from vertector_semantic_cache.observability.tracing import (
@@ -24,9 +29,11 @@ from redisvl.utils.rerank import BaseReranker
 from vertector_semantic_cache.core.config import CacheConfig
 from vertector_semantic_cache.core.metrics import CacheMetrics
 from vertector_semantic_cache.core.l1_cache import L1Cache, L1CacheEntry
+from vertector_semantic_cache.core.negative_cache import NegativeCache
 from vertector_semantic_cache.core.tag_manager import TagManager
 from vertector_semantic_cache.vectorizers.factory import VectorizerFactory
 from vertector_semantic_cache.rerankers.factory import RerankerFactory
+from vertector_semantic_cache.utils.batch import EmbeddingBatcher, batch_vectorize
 from vertector_semantic_cache.utils.exceptions import (
     CacheConnectionError,
     CacheOperationError,
@@ -35,6 +42,12 @@ from vertector_semantic_cache.utils.logging import get_logger, setup_logging
 
 logger = get_logger(__name__)
 
+# Shared no-op span context used when tracing is disabled
+_NOOP_CTX = nullcontext(None)
+
+# L1 key: (xxh3_64 of prompt, user_id, context key hash)
+L1Key = Tuple[int, Optional[str], Optional[str]]
+
 
 class AsyncSemanticCacheManager:
     """
@@ -74,13 +87,40 @@ class AsyncSemanticCacheManager:
             config: Cache configuration
         """
         self.config = config
-        self.metrics = CacheMetrics()
+        self.metrics = CacheMetrics(
+            prometheus_cache_seconds=config.observability.prometheus_cache_seconds
+        )
         self._cache: Optional[SemanticCache] = None
         self._l1_cache: Optional[L1Cache] = None
+        self._negative_cache: Optional[NegativeCache] = None
         self.tag_manager: Optional[TagManager] = None
         self._reranker: Optional[BaseReranker] = None
+        self._refresh_q: Optional[asyncio.Queue] = None
+        self._refresh_workers: List[asyncio.Task] = []
+        self._l2_semaphore: Optional[asyncio.Semaphore] = None
+        self._batcher: Optional[EmbeddingBatcher] = None
+        # Element type of query blobs; must match the index (e.g. int8)
+        self._vector_dtype = np.dtype(np.float32)
         self._initialized = False
         
+        # Public config as JSON, rebuilt only after set_threshold()/set_ttl()
+        self._config_json: Optional[str] = None
+        
+        # Static FT.SEARCH argument tuples, memoized per query shape
+        self._cmd_head = ("FT.SEARCH", config.name)
+        self._search_args_cache: LRUCache = LRUCache(maxsize=256)
+        
+        # Filter expressions, memoized per (user_id, filters) shape
+        self._filter_expr_cache: LRUCache = LRUCache(maxsize=1024)
+        
+        # Feature flags read on every check()
+        self._swr_on = config.enable_stale_while_revalidate
+        self._ver_check_on = config.enable_version_checking
+        
+        # Fields returned by FT.SEARCH (never the stored prompt_vector);
+        # metadata carries cached_at and cache_version for the SWR/version gates
+        self._default_return_fields = ("response", "prompt", "vector_distance", "metadata")
+        
         # Setup logging
         setup_logging(
             level=config.log_level,
@@ -88,8 +128,9 @@ class AsyncSemanticCacheManager:
         )
         
         # Initialize tracing if enabled
+        self._trace_on = False
         if config.observability.enable_tracing and TRACING_AVAILABLE:
-            setup_tracing(
+            self._trace_on = setup_tracing(
                 service_name=config.observability.service_name,
                 exporter_type=config.observability.tracing_exporter,
                 endpoint=config.observability.tracing_endpoint,
@@ -111,6 +152,13 @@ class AsyncSemanticCacheManager:
         try:
             logger.info("Creating vectorizer")
             vectorizer = VectorizerFactory.create(self.config.vectorizer)
+            self._vector_dtype = np.dtype(vectorizer.dtype.lower())
+            # Coalesces embeddings for concurrent checks into shared calls
+            self._batcher = EmbeddingBatcher(
+                vectorizer,
+                max_batch=self.config.embedding_max_batch,
+                window_seconds=self.config.embedding_batch_window_ms / 1000,
+            )
             
             # Add context_hash to filterable_fields if enabled
             filterable_fields = self.config.filterable_fields or []
@@ -141,7 +189,18 @@ class AsyncSemanticCacheManager:
                 self._l1_cache = L1Cache(
                     max_size=self.config.l1_cache.max_size,
                     ttl_seconds=self.config.l1_cache.ttl_seconds,
-                    strategy=self.config.l1_cache.eviction_strategy
+                    strategy=self.config.l1_cache.eviction_strategy,
+                    track_access=self.config.l1_cache.track_access,
+                    admission_probability=self.config.l1_cache.admission_probability,
+                    shards=self.config.l1_cache.shards
+                )
+            
+            # Initialize negative cache if enabled
+            if self.config.negative_cache.enabled:
+                logger.info("Initializing negative cache")
+                self._negative_cache = NegativeCache(
+                    capacity=self.config.negative_cache.capacity,
+                    ttl_seconds=self.config.negative_cache.ttl_seconds
                 )
             
             # Initialize TagManager if enabled
@@ -152,6 +211,27 @@ class AsyncSemanticCacheManager:
                 redis_client = await self._cache._get_async_redis_client()
                 self.tag_manager = TagManager(redis_client)
             
+            # Bound concurrent L2 lookups in batch_check to the pool size
+            self._l2_semaphore = asyncio.Semaphore(
+                self.config.max_concurrent_l2 or self.config.connection_pool_size
+            )
+            
+            # Start bounded background refresh workers for stale hits
+            if self._swr_on and not self._refresh_workers:
+                self._refresh_q = asyncio.Queue(maxsize=self.config.stale_refresh_queue_size)
+                self._refresh_workers = [
+                    asyncio.create_task(self._refresh_worker())
+                    for _ in range(self.config.stale_refresh_workers)
+                ]
+            
+            # Warm the model and the batch embedding cache; failures aren't fatal
+            if self.config.warm_prompts:
+                logger.info(f"Warming embeddings for {len(self.config.warm_prompts)} prompts")
+                try:
+                    await batch_vectorize(self.config.warm_prompts, vectorizer)
+                except Exception as e:
+                    logger.warning(f"Embedding warm-up failed: {e}")
+            
             self._initialized = True
             logger.info("AsyncSemanticCacheManager initialized successfully")
         
@@ -221,53 +301,88 @@ class AsyncSemanticCacheManager:
         if not self._initialized:
             await self.initialize()
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         self.metrics.increment_query()
         
-        # Start tracing span
-        trace_ctx = trace_operation(
-            "cache.check",
-            attributes={
-                "cache.prompt_length": len(prompt),
-                "cache.user_id": user_id or "none",
-                "cache.has_context": bool(context),
-            }
-        ) if TRACING_AVAILABLE else None
+        # Start tracing span (shared no-op context when tracing is off)
+        if self._trace_on:
+            span_ctx = trace_operation(
+                "cache.check",
+                attributes={
+                    "cache.prompt_length": len(prompt),
+                    "cache.user_id": user_id or "none",
+                    "cache.has_context": bool(context),
+                }
+            )
+        else:
+            span_ctx = _NOOP_CTX
         
-        try:
-            if trace_ctx:
-                span = trace_ctx.__enter__()
+        # Full-context hash used by the L2 filter; with L1 enabled the key
+        # hash comes from the same pass (shared unless context_fields projects)
+        context_hash = None
+        key_hash = None
+        if context and self.config.enable_context_hashing:
+            if self._l1_cache is not None:
+                context_hash, key_hash = self._context_digests(context)
             else:
-                span = None
+                context_hash = self._hash_context(context)
+        
+        # Context key shared by the L1 probe and L1 populate
+        l1_key = None
+        if self._l1_cache is not None:
+            l1_key = self._generate_context_key(
+                prompt, user_id, context, _precomputed_ctx_hash=key_hash
+            )
+        
+        # Negative cache keys ignore extra filters, so only use it without them.
+        # The key mirrors the L2 lookup (full context, not context_fields) so a
+        # miss in one context never hides a hit in a sibling context.
+        use_negative = self._negative_cache is not None and not filters
+        negative_key = (prompt, user_id or None, context_hash) if use_negative else None
+        
+        with span_ctx as span:
+            # 0. Skip prompts that recently missed L2 (before embedding)
+            if use_negative and self._negative_cache.contains(negative_key):
+                self.metrics.record_miss()
+                self.metrics.record_negative_cache_hit()
+                if span is not None:
+                    add_span_attributes(
+                        cache_hit=False,
+                        cache_layer="negative",
+                    )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Negative cache HIT for prompt: '{prompt[:50]}...'")
+                return None
             
             # 1. Check L1 Cache (In-Memory)
             if self._l1_cache is not None:
-                l1_start = time.time()
-                l1_key = self._generate_context_key(prompt, user_id, context)
+                l1_start_ns = time.perf_counter_ns()
                 l1_entry = self._l1_cache.get(l1_key)
                 
                 if l1_entry:
-                    l1_latency = time.time() - l1_start
-                    total_latency = time.time() - start_time
+                    now_ns = time.perf_counter_ns()
+                    l1_ns = now_ns - l1_start_ns
+                    total_ns = now_ns - start_ns
                     
                     # Record metrics
-                    self.metrics.record_hit(total_latency)
-                    self.metrics.record_l1_hit(l1_latency)
+                    self.metrics.record_hit_ns(total_ns)
+                    self.metrics.record_l1_hit(l1_ns / 1e9)
                     if context:
                         # Extract context type for metrics
                         context_type = context.get("user_persona") or context.get("conversation_id") or "unknown"
                         self.metrics.record_context_hit(str(context_type))
                     
                     # Add tracing attributes
-                    if span:
+                    if span is not None:
                         add_span_attributes(
                             cache_hit=True,
                             cache_layer="L1",
-                            latency_ms=total_latency * 1000,
-                            l1_latency_ms=l1_latency * 1000,
+                            latency_ms=total_ns / 1e6,
+                            l1_latency_ms=l1_ns / 1e6,
                         )
                     
-                    logger.info(f"L1 Cache HIT for prompt: '{prompt[:50]}...' (latency: {total_latency*1000:.2f}ms)")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"L1 Cache HIT for prompt: '{prompt[:50]}...' (latency: {total_ns / 1e6:.2f}ms)")
                     return l1_entry.response
                 else:
                     # L1 miss
@@ -276,9 +391,7 @@ class AsyncSemanticCacheManager:
             try:
                 # Build filter expression
                 # Add context filter if context is provided
-                if context and self.config.enable_context_hashing:
-                    context_str = json.dumps(context, sort_keys=True)
-                    context_hash = hashlib.sha256(context_str.encode()).hexdigest()[:16]
+                if context_hash is not None:
                     if filters is None:
                         filters = {}
                     filters["context_hash"] = context_hash
@@ -287,90 +400,26 @@ class AsyncSemanticCacheManager:
                 
                 # Check cache (L2)
                 # Check cache (L2)
-                l2_start = time.time()
+                l2_start_ns = time.perf_counter_ns()
                 
                 async def _check():
-                    # Generate embedding
-                    vector = self._cache._vectorizer.embed(prompt)
-                    if isinstance(vector, list) and isinstance(vector[0], list):
-                        vector = vector[0]
-                    
-                    # Prepare query parameters
-                    import numpy as np
-                    vector_blob = np.array(vector, dtype=np.float32).tobytes()
-                    threshold = float(self.config.distance_threshold)
-                    
-                    # Build native RediSearch query
-                    # Using VECTOR_RANGE to enforce threshold at DB level
-                    # syntax: @prompt_vector:[VECTOR_RANGE {radius} $blob]=>{$YIELD_DISTANCE_AS: vector_distance}
-                    
-                    base_query = f"@prompt_vector:[VECTOR_RANGE {threshold} $blob]=>{{$YIELD_DISTANCE_AS: vector_distance}}"
-                    
-                    # Add filters if present
-                    if filter_expression:
-                        # RedisVL filter expression string conversion is needed
-                        # Simplification: if we have filters, we might need to combine them
-                        # For now, we'll prefix them: (@filter) @vector:[...]
-                        filter_str = str(filter_expression)
-                        query_str = f"({filter_str}) {base_query}"
-                    else:
-                        query_str = base_query
+                    # Generate embedding (served from the embedding cache when seen before)
+                    vector_blob = (await self._embed([prompt]))[0].tobytes()
+                    query_str = self._build_query_str(filter_expression)
 
                     # Execute raw command
                     # FT.SEARCH {index_name} {query} PARAMS 2 blob {vector_blob} SORTBY vector_distance ASC LIMIT 0 {num_results} DIALECT 2
                     try:
-                        cmd = [
-                            "FT.SEARCH",
-                            self.config.name,  # Index name usually matches cache name
+                        head, tail = self._search_args(
                             query_str,
-                            "PARAMS", "2", "blob", vector_blob,
-                            "SORTBY", "vector_distance", "ASC",
-                            "LIMIT", "0", str(num_results),
-                            # DIALECT 2 is needed for vector search
-                            "DIALECT", "2"
-                        ]
-                        
+                            num_results,
+                            tuple(return_fields) if return_fields else None,
+                        )
                         redis_client = await self._cache._get_async_redis_client()
-                        raw_results = await redis_client.execute_command(*cmd)
-                        
-                        # Parse raw results
-                        # [count, key1, [field, val, ...], key2, ...]
-                        count = raw_results[0]
-                        parsed_results = []
-                        
-                        for i in range(1, len(raw_results), 2):
-                            key = raw_results[i]
-                            fields_raw = raw_results[i+1]
-                            
-                            # Convert list [k, v, k, v] to dict
-                            doc = {
-                                "metadata": {}
-                            }
-                            
-                            for j in range(0, len(fields_raw), 2):
-                                # Decode bytes to str
-                                f_name = fields_raw[j].decode('utf-8') if isinstance(fields_raw[j], bytes) else fields_raw[j]
-                                f_val_raw = fields_raw[j+1]
-                                f_val = f_val_raw.decode('utf-8') if isinstance(f_val_raw, bytes) else f_val_raw
-                                
-                                if f_name == "vector_distance":
-                                    doc["vector_distance"] = float(f_val)
-                                elif f_name == "prompt":
-                                    doc["prompt"] = f_val
-                                elif f_name == "response":
-                                    doc["response"] = f_val
-                                elif f_name == "prompt_vector":
-                                    # Skip vector data in output
-                                    pass
-                                else:
-                                    # All other fields go into metadata
-                                    # Try to parse JSON if it looks like it?
-                                    # RedisVL might store simple types.
-                                    doc["metadata"][f_name] = f_val
-                            
-                            parsed_results.append(doc)
-                            
-                        return parsed_results
+                        raw_results = await redis_client.execute_command(
+                            *self._cmd_head, *head, vector_blob, *tail
+                        )
+                        return self._parse_search_results(raw_results)
                         
                     except Exception as e:
                         logger.error(f"Native vector search failed: {e}")
@@ -384,136 +433,82 @@ class AsyncSemanticCacheManager:
                 
                 cached_results = await self._retry_operation(_check)
                 
-                if cached_results and len(cached_results) > 0:
+                if cached_results:
+                    top = cached_results[0]
+                    
                     # Double check distance (sanity check)
-                    result = cached_results[0]
-                    if "vector_distance" in result:
-                        distance = float(result["vector_distance"])
-                        if distance > self.config.distance_threshold:
-                            # This should happen rarely with VECTOR_RANGE, but precision errors exist
-                            logger.info(f"L2 Cache MISS (Post-filter): {distance:.4f}")
-                            self.metrics.record_miss()
-                            return None
+                    distance = top.get("vector_distance")
+                    if distance is not None and float(distance) > self.config.distance_threshold:
+                        # This should happen rarely with VECTOR_RANGE, but precision errors exist
+                        if logger.isEnabledFor(logging.INFO):
+                            logger.info(f"L2 Cache MISS (Post-filter): {float(distance):.4f}")
+                        self.metrics.record_miss()
+                        return None
                     
                     # Apply reranking if enabled
                     if self._reranker:
                         cached_results = await self._rerank_results(prompt, cached_results)
                         self.metrics.record_rerank()
+                        if cached_results:
+                            top = cached_results[0]
+                    
+                    # Staleness/version gates and L1 populate
+                    response = self._process_hit(top, prompt, user_id, context, l1_key)
+                    if response is None:
+                        return None
                     
                     # Record L2 hit
-                    l2_latency = time.time() - l2_start
-                    total_latency = time.time() - start_time
-                    self.metrics.record_hit(total_latency)
-                    self.metrics.record_l2_hit(l2_latency)
+                    now_ns = time.perf_counter_ns()
+                    l2_ns = now_ns - l2_start_ns
+                    total_ns = now_ns - start_ns
+                    self.metrics.record_hit_ns(total_ns)
+                    self.metrics.record_l2_hit(l2_ns / 1e9)
                     
                     if context:
                         context_type = context.get("user_persona") or context.get("conversation_id") or "unknown"
                         self.metrics.record_context_hit(str(context_type))
                     
                     # Add tracing attributes
-                    if span:
+                    if span is not None:
                         add_span_attributes(
                             cache_hit=True,
                             cache_layer="L2",
-                            latency_ms=total_latency * 1000,
-                            l2_latency_ms=l2_latency * 1000,
+                            latency_ms=total_ns / 1e6,
+                            l2_latency_ms=l2_ns / 1e6,
                         )
                     
-                    logger.info(
-                        f"Cache HIT for prompt: '{prompt[:50]}...' "
-                        f"(threshold: {self.config.distance_threshold}, "
-                        f"latency: {total_latency*1000:.2f}ms)"
-                    )
-                    
-                    # Check staleness if enabled
-                    if self.config.enable_stale_while_revalidate and cached_results:
-                        entry_age = self._get_entry_age(cached_results[0])
-                        
-                        # Check if entry is stale (older than TTL)
-                        if entry_age > (self.config.ttl or 3600):
-                            if entry_age < self.config.max_stale_age_seconds:
-                                # Serve stale + trigger background refresh
-                                self.metrics.record_stale_served(entry_age)
-                                logger.info(
-                                    f"Serving stale entry (age={entry_age:.0f}s), "
-                                    f"refreshing in background"
-                                )
-                                
-                                # Trigger background refresh asynchronously
-                                # Note: Background refresh requires user to re-call LLM
-                                # This is a notification mechanism, not automatic LLM call
-                                asyncio.create_task(
-                                    self._background_refresh_notification(
-                                        prompt=prompt,
-                                        user_id=user_id,
-                                        context=context,
-                                        entry_age=entry_age
-                                    )
-                                )
-                            else:
-                                # Too stale, refuse to serve
-                                self.metrics.record_stale_refused()
-                                logger.warning(
-                                    f"Entry too stale (age={entry_age:.0f}s > max={self.config.max_stale_age_seconds}), "
-                                    f"refusing to serve"
-                                )
-                                # Return None to force fresh fetch
-                                self.metrics.record_miss()
-                                self.metrics.record_l2_miss()
-                                return None
-                    
-                    # Check version if enabled
-                    if self.config.enable_version_checking and cached_results:
-                        stored_version = cached_results[0].get("metadata", {}).get("cache_version")
-                        if stored_version and stored_version != self.config.cache_version:
-                            self.metrics.record_version_mismatch()
-                            logger.info(
-                                f"Version mismatch: stored={stored_version} != "
-                                f"current={self.config.cache_version}, invalidating"
-                            )
-                            # Return None to force fresh fetch
-                            self.metrics.record_miss()
-                            self.metrics.record_l2_miss()
-                            return None
-                    
-                    response = cached_results[0].get("response")
-                    
-                    # Update L1 Cache
-                    if self._l1_cache is not None and response:
-                        from datetime import datetime, timezone
-                        l1_key = self._generate_context_key(prompt, user_id, context)
-                        self._l1_cache.set(l1_key, L1CacheEntry(
-                            response=response,
-                            metadata=cached_results[0].get("metadata"),
-                            cached_at=datetime.now(timezone.utc)
-                        ))
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(
+                            f"Cache HIT for prompt: '{prompt[:50]}...' "
+                            f"(threshold: {self.config.distance_threshold}, "
+                            f"latency: {total_ns / 1e6:.2f}ms)"
+                        )
                     
                     return response
                 else:
                     # L2 miss
                     self.metrics.record_miss()
                     self.metrics.record_l2_miss()
+                    if use_negative:
+                        self._negative_cache.add(negative_key)
                     
-                    if span:
+                    if span is not None:
                         add_span_attributes(
                             cache_hit=False,
                             cache_layer="L2",
                         )
                     
-                    logger.info(f"Cache MISS for prompt: '{prompt[:50]}...'")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Cache MISS for prompt: '{prompt[:50]}...'")
                     return None
             
             except Exception as e:
                 logger.error(f"Error checking cache: {e}")
                 self.metrics.record_error()
-                if span:
+                if span is not None:
                     add_span_attributes(error=True, error_message=str(e))
                 # Graceful degradation - return None on error
                 return None
-        
-        finally:
-            if trace_ctx:
-                trace_ctx.__exit__(None, None, None)
     
     async def store(
         self,
@@ -550,6 +545,8 @@ class AsyncSemanticCacheManager:
             cache_metadata = metadata or {}
             from datetime import datetime, timezone
             cache_metadata["cached_at"] = datetime.now(timezone.utc).isoformat()
+            if self._ver_check_on:
+                cache_metadata["cache_version"] = self.config.cache_version
             
             # Prepare filters
             filter_dict = {}
@@ -562,8 +559,7 @@ class AsyncSemanticCacheManager:
             if context:
                 if self.config.enable_context_hashing:
                     # Add context hash to metadata
-                    context_str = json.dumps(context, sort_keys=True)
-                    context_hash = hashlib.sha256(context_str.encode()).hexdigest()[:16]
+                    context_hash = self._hash_context(context)
                     cache_metadata["context_hash"] = context_hash
                     
                     # Add to filters for L2 retrieval
@@ -583,6 +579,10 @@ class AsyncSemanticCacheManager:
                 )
             
             key = await self._retry_operation(_store)
+            
+            # A new entry can turn earlier misses into hits
+            if self._negative_cache is not None:
+                self._negative_cache.clear()
             logger.info(f"Stored in cache: '{prompt[:50]}...' (key: {key})")
             
             # Store in L1 Cache
@@ -591,7 +591,7 @@ class AsyncSemanticCacheManager:
                 self._l1_cache.set(l1_key, L1CacheEntry(
                     response=response,
                     metadata=cache_metadata,
-                    cached_at=datetime.now(timezone.utc)
+                    cached_at_ns=time.time_ns()
                 ))
             
             # Add tags if enabled
@@ -613,6 +613,8 @@ class AsyncSemanticCacheManager:
         try:
             if self._l1_cache is not None:
                 self._l1_cache.clear()
+            if self._negative_cache is not None:
+                self._negative_cache.clear()
                 
             await self._cache.aclear()
             logger.info("Cache cleared")
@@ -628,6 +630,8 @@ class AsyncSemanticCacheManager:
         try:
             if self._l1_cache is not None:
                 self._l1_cache.clear()
+            if self._negative_cache is not None:
+                self._negative_cache.clear()
                 
             await self._cache.adelete()
             logger.info("Cache deleted")
@@ -699,8 +703,9 @@ class AsyncSemanticCacheManager:
         Check cache for multiple prompts in parallel (5-10x faster).
         
         This is significantly faster than calling check() sequentially because:
-        - Parallel L1 cache lookups
-        - Concurrent L2 queries with asyncio.gather
+        - L1 lookups under a single lock acquisition
+        - Duplicate prompts coalesced into one L2 lookup
+        - L2 queries pipelined into a single Redis round-trip
         - Reduced overhead
         
         Args:
@@ -732,120 +737,172 @@ class AsyncSemanticCacheManager:
         if len(user_ids) != n or len(contexts) != n:
             raise ValueError("user_ids and contexts lists must match prompts length")
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         results: List[Optional[str]] = [None] * n
         l2_indices: List[int] = []  # Indices that need L2 lookup
         
-        # Track metrics
-        for _ in prompts:
-            self.metrics.increment_query()
+        # Hash each distinct context object once for both L1 keys and L2 filters
+        ctx_digests: Dict[int, Tuple[str, str]] = {}
+        if self.config.enable_context_hashing:
+            for context in contexts:
+                if context and id(context) not in ctx_digests:
+                    ctx_digests[id(context)] = self._context_digests(context)
+        
+        # Metrics are accumulated locally and applied once per phase
+        self.metrics.increment_query(n)
+        context_type_counter: Counter = Counter()
         
-        # Phase 1: Check L1 cache for all prompts
+        # Context type bucket per prompt (None when there is no context)
+        context_types: List[Optional[str]] = [
+            str(context.get("user_persona") or context.get("conversation_id") or "unknown")
+            if context else None
+            for context in contexts
+        ]
+        
+        # Phase 1: Check L1 cache for all prompts (single lock acquisition)
         if self._l1_cache is not None:
-            for i, (prompt, user_id, context) in enumerate(zip(prompts, user_ids, contexts)):
-                l1_start = time.time()
-                l1_key = self._generate_context_key(prompt, user_id, context)
-                l1_entry = self._l1_cache.get(l1_key)
-                
+            l1_start_ns = time.perf_counter_ns()
+            ctx_key_hashes = [
+                ctx_digests[id(context)][1] if context and ctx_digests else None
+                for context in contexts
+            ]
+            l1_keys = self._keys_batch(prompts, user_ids, ctx_key_hashes)
+            l1_entries = self._l1_cache.get_many(l1_keys)
+            l1_end_ns = time.perf_counter_ns()
+            
+            # Amortize the phase latency across lookups
+            l1_latency = (l1_end_ns - l1_start_ns) / n / 1e9
+            total_latency = (l1_end_ns - start_ns) / 1e9
+            
+            for i, l1_entry in enumerate(l1_entries):
                 if l1_entry:
-                    l1_latency = time.time() - l1_start
-                    total_latency = time.time() - start_time
-                    
-                    # Record metrics
-                    self.metrics.record_hit(total_latency)
-                    self.metrics.record_l1_hit(l1_latency)
-                    if context:
-                        context_type = context.get("user_persona") or context.get("conversation_id") or "unknown"
-                        self.metrics.record_context_hit(str(context_type))
+                    if context_types[i]:
+                        context_type_counter[context_types[i]] += 1
                     
                     results[i] = l1_entry.response
                 else:
-                    self.metrics.record_l1_miss()
                     l2_indices.append(i)
+            
+            l1_hit_count = n - len(l2_indices)
+            self.metrics.record_hits([total_latency] * l1_hit_count)
+            self.metrics.record_l1_hits([l1_latency] * l1_hit_count)
+            self.metrics.record_l1_miss(len(l2_indices))
         else:
             l2_indices = list(range(n))
         
-        # Phase 2: Parallel L2 lookup for L1 misses
+        # Phase 2: Pipelined L2 lookup for L1 misses
         if l2_indices:
-            l2_start = time.time()
+            l2_start_ns = time.perf_counter_ns()
             
-            # Create parallel L2 check tasks
-            l2_tasks = []
+            # Coalesce duplicates: same prompt, user and context filter => same result
+            unique_l2: Dict[Tuple[str, Optional[str], Optional[str]], List[int]] = {}
             for idx in l2_indices:
-                prompt = prompts[idx]
-                user_id = user_ids[idx]
                 context = contexts[idx]
+                ctx_hash = (
+                    ctx_digests[id(context)][0]
+                    if context and self.config.enable_context_hashing
+                    else None
+                )
+                unique_l2.setdefault((prompts[idx], user_ids[idx], ctx_hash), []).append(idx)
+            
+            # Build filters
+            l2_prompts = []
+            filter_expressions = []
+            for prompt, user_id, ctx_hash in unique_l2:
+                filters = {"context_hash": ctx_hash} if ctx_hash else {}
+                l2_prompts.append(prompt)
+                filter_expressions.append(
+                    self._build_filter_expression(user_id, filters)
+                )
+            
+            try:
+                # One pipelined round-trip for all L1 misses
+                l2_results_list = await self._batched_l2_check(
+                    l2_prompts, filter_expressions, num_results, return_fields
+                )
+            except Exception as e:
+                logger.warning(f"Pipelined L2 check failed, falling back to per-prompt checks: {e}")
                 
-                # Build filter
-                filters = {}
-                if context and self.config.enable_context_hashing:
-                    context_str = json.dumps(context, sort_keys=True)
-                    context_hash = hashlib.sha256(context_str.encode()).hexdigest()[:16]
-                    filters["context_hash"] = context_hash
-                
-                filter_expression = self._build_filter_expression(user_id, filters)
-                
-                # Define async task
-                async def _check_one(p=prompt, fe=filter_expression):
+                async def _check_one(p, fe):
                     try:
-                        return await self._cache.acheck(
-                            prompt=p,
-                            num_results=num_results,
-                            return_fields=return_fields or ["response", "prompt", "metadata"],
-                            filter_expression=fe,
-                        )
+                        async with self._l2_semaphore:
+                            return await self._cache.acheck(
+                                prompt=p,
+                                num_results=num_results,
+                                return_fields=return_fields or ["response", "prompt", "metadata"],
+                                filter_expression=fe,
+                            )
                     except Exception as e:
                         logger.error(f"Error in L2 check: {e}")
                         return None
                 
-                l2_tasks.append(_check_one())
+                # Execute L2 checks concurrently (bounded by _l2_semaphore)
+                l2_results_list = await asyncio.gather(
+                    *(_check_one(p, fe) for p, fe in zip(l2_prompts, filter_expressions))
+                )
             
-            # Execute all L2 checks concurrently
-            l2_results_list = await asyncio.gather(*l2_tasks)
+            l2_end_ns = time.perf_counter_ns()
+            l2_latency = (l2_end_ns - l2_start_ns) / 1e9
             
-            l2_latency = time.time() - l2_start
+            # Fan each unique result back out to its indices
+            fanned_out = [
+                (idx, l2_result)
+                for indices, l2_result in zip(unique_l2.values(), l2_results_list)
+                for idx in indices
+            ]
             
             # Process L2 results
-            for idx, l2_result in zip(l2_indices, l2_results_list):
+            l2_hit_count = 0
+            for idx, l2_result in fanned_out:
                 if l2_result and len(l2_result) > 0:
                     # L2 hit
-                    total_latency = time.time() - start_time
-                    self.metrics.record_hit(total_latency)
-                    self.metrics.record_l2_hit(l2_latency / len(l2_indices))
+                    l2_hit_count += 1
                     
-                    if contexts[idx]:
-                        context_type = contexts[idx].get("user_persona") or contexts[idx].get("conversation_id") or "unknown"
-                        self.metrics.record_context_hit(str(context_type))
+                    if context_types[idx]:
+                        context_type_counter[context_types[idx]] += 1
                     
                     response = l2_result[0].get("response")
                     results[idx] = response
                     
                     # Populate L1 cache
                     if self._l1_cache is not None and response:
-                        from datetime import datetime, timezone
-                        l1_key = self._generate_context_key(prompts[idx], user_ids[idx], contexts[idx])
-                        self._l1_cache.set(l1_key, L1CacheEntry(
+                        # Reuse the Phase 1 key
+                        self._l1_cache.offer(l1_keys[idx], L1CacheEntry(
                             response=response,
                             metadata=l2_result[0].get("metadata"),
-                            cached_at=datetime.now(timezone.utc)
+                            cached_at_ns=time.time_ns()
                         ))
-                else:
-                    # L2 miss
-                    self.metrics.record_miss()
-                    self.metrics.record_l2_miss()
+            
+            l2_miss_count = len(fanned_out) - l2_hit_count
+            total_latency = (l2_end_ns - start_ns) / 1e9
+            self.metrics.record_hits([total_latency] * l2_hit_count)
+            self.metrics.record_l2_hits([l2_latency / len(l2_indices)] * l2_hit_count)
+            self.metrics.record_miss(l2_miss_count)
+            self.metrics.record_l2_miss(l2_miss_count)
         
-        logger.info(
-            f"Batch check: {len(prompts)} prompts, "
-            f"{sum(1 for r in results if r)} hits, "
-            f"{sum(1 for r in results if r is None)} misses, "
-            f"{(time.time() - start_time)*1000:.2f}ms"
-        )
+        self.metrics.record_context_hits(context_type_counter)
+        
+        if logger.isEnabledFor(logging.INFO):
+            hits = sum(1 for r in results if r is not None)
+            logger.info(
+                "Batch check: %d prompts, %d hits, %d misses, %.2fms",
+                n, hits, n - hits, (time.perf_counter_ns() - start_ns) / 1e6,
+            )
         
         return results
 
 
     async def disconnect(self) -> None:
         """Disconnect from Redis."""
+        await self._stop_refresh_workers()
+        
+        if self._batcher is not None:
+            await self._batcher.close()
+        
+        # Stops the TTL sweeper thread
+        if self._l1_cache is not None:
+            self._l1_cache.close()
+        
         if not self._initialized or not self._cache:
             return
         
@@ -863,9 +920,28 @@ class AsyncSemanticCacheManager:
         return self.metrics.to_dict()
     
     def get_metrics_prometheus(self) -> str:
-        """Get metrics in Prometheus format."""
+        """Get metrics in Prometheus format.
+        
+        Rendered on every call unless ``observability.prometheus_cache_seconds``
+        is set, in which case calls within that window return the same
+        (possibly slightly stale) text.
+        """
         return self.metrics.to_prometheus()
     
+    def iter_metrics_prometheus(self) -> AsyncIterator[bytes]:
+        """Stream metrics in Prometheus format as UTF-8 chunks."""
+        return self.metrics.iter_prometheus()
+    
+    def get_config_json(self) -> str:
+        """Get the configuration as indented JSON, without connection_kwargs."""
+        if self._config_json is None:
+            config = self.config.model_dump(exclude={"connection_kwargs"})
+            # Values JSON can't hold (e.g. stale_refresh_callback) are rendered with str()
+            self._config_json = orjson.dumps(
+                config, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        return self._config_json
+    
     def reset_metrics(self) -> None:
         """Reset all metrics to zero."""
         self.metrics.reset()
@@ -882,8 +958,11 @@ class AsyncSemanticCacheManager:
             raise ValueError("Threshold must be between 0.0 and 1.0")
         
         self.config.distance_threshold = threshold
+        self._config_json = None
         if self._cache:
             self._cache.set_threshold(threshold)
+        if self._negative_cache is not None:
+            self._negative_cache.clear()
         logger.info(f"Threshold updated to {threshold}")
     
     def set_ttl(self, ttl: int) -> None:
@@ -894,10 +973,33 @@ class AsyncSemanticCacheManager:
             ttl: TTL in seconds
         """
         self.config.ttl = ttl
+        self._config_json = None
         if self._cache:
             self._cache.set_ttl(ttl)
         logger.info(f"TTL updated to {ttl}s")
         
+    async def _refresh_worker(self) -> None:
+        """Drain the stale-refresh queue until cancelled."""
+        while True:
+            job = await self._refresh_q.get()
+            try:
+                await self._background_refresh_notification(**job)
+            except Exception as e:
+                logger.error(f"Error in background refresh worker: {e}")
+            finally:
+                self._refresh_q.task_done()
+    
+    async def _stop_refresh_workers(self) -> None:
+        """Cancel background refresh workers, dropping pending jobs."""
+        if not self._refresh_workers:
+            return
+        
+        for task in self._refresh_workers:
+            task.cancel()
+        await asyncio.gather(*self._refresh_workers, return_exceptions=True)
+        self._refresh_workers = []
+        self._refresh_q = None
+    
     async def _background_refresh_notification(
         self,
         prompt: str,
@@ -954,6 +1056,95 @@ class AsyncSemanticCacheManager:
                 "set stale_refresh_callback in CacheConfig"
             )
     
+    def _process_hit(
+        self,
+        top: Dict[str, Any],
+        prompt: str,
+        user_id: Optional[str],
+        context: Optional[Dict[str, Any]],
+        l1_key: Optional[L1Key],
+    ) -> Optional[str]:
+        """Apply staleness/version gates to the top L2 result and populate L1.
+        
+        Args:
+            top: Best-ranked L2 result
+            prompt: The prompt being checked
+            user_id: Optional user ID
+            context: Optional context
+            l1_key: Context key computed for the L1 probe
+            
+        Returns:
+            Cached response, or None if the entry must not be served
+            (the miss is recorded here)
+        """
+        meta = top.get("metadata") or {}
+        response = top.get("response")
+        if not response:
+            return self._refuse_hit()
+        
+        # Common path has neither feature enabled - skip both gates at once
+        if self._swr_on or self._ver_check_on:
+            if self._swr_on:
+                entry_age = self._get_entry_age(top)
+                
+                # Check if entry is stale (older than TTL)
+                if entry_age > (self.config.ttl or 3600):
+                    if entry_age < self.config.max_stale_age_seconds:
+                        # Serve stale + trigger background refresh
+                        self.metrics.record_stale_served(entry_age)
+                        logger.info(
+                            f"Serving stale entry (age={entry_age:.0f}s), "
+                            f"refreshing in background"
+                        )
+                        
+                        # Queue background refresh for the worker pool
+                        # Note: Background refresh requires user to re-call LLM
+                        # This is a notification mechanism, not automatic LLM call
+                        try:
+                            self._refresh_q.put_nowait(dict(
+                                prompt=prompt,
+                                user_id=user_id,
+                                context=context,
+                                entry_age=entry_age
+                            ))
+                        except asyncio.QueueFull:
+                            self.metrics.record_refresh_dropped()
+                    else:
+                        # Too stale, refuse to serve
+                        self.metrics.record_stale_refused()
+                        logger.warning(
+                            f"Entry too stale (age={entry_age:.0f}s > max={self.config.max_stale_age_seconds}), "
+                            f"refusing to serve"
+                        )
+                        return self._refuse_hit()
+            
+            if self._ver_check_on:
+                stored_version = meta.get("cache_version")
+                if stored_version and stored_version != self.config.cache_version:
+                    self.metrics.record_version_mismatch()
+                    logger.info(
+                        f"Version mismatch: stored={stored_version} != "
+                        f"current={self.config.cache_version}, invalidating"
+                    )
+                    return self._refuse_hit()
+        
+        # Update L1 Cache
+        if self._l1_cache is not None:
+            self._l1_cache.offer(l1_key, L1CacheEntry(
+                response=response,
+                metadata=meta,
+                cached_at_ns=time.time_ns()
+            ))
+        
+        return response
+    
+    def _refuse_hit(self) -> None:
+        """Record an L2 result that was found but not served as a miss."""
+        # Return None to force fresh fetch
+        self.metrics.record_miss()
+        self.metrics.record_l2_miss()
+        return None
+    
     def _get_entry_age(self, cache_result: Dict[str, Any]) -> float:
         """Calculate age of cache entry in seconds.
         
@@ -965,54 +1156,327 @@ class AsyncSemanticCacheManager:
         """
         try:
             from datetime import datetime, timezone
-            stored_at_str = cache_result.get("metadata", {}).get("stored_at")
-            if not stored_at_str:
+            cached_at_str = cache_result.get("metadata", {}).get("cached_at")
+            if not cached_at_str:
                 return 0.0
             
-            stored_at = datetime.fromisoformat(stored_at_str.replace('Z', '+00:00'))
-            age = (datetime.now(timezone.utc) - stored_at).total_seconds()
+            cached_at = datetime.fromisoformat(cached_at_str.replace('Z', '+00:00'))
+            age = (datetime.now(timezone.utc) - cached_at).total_seconds()
             return age
         except Exception as e:
             logger.warning(f"Error calculating entry age: {e}")
             return 0.0
     
+    @staticmethod
+    def _hash_context(context: Dict[str, Any]) -> str:
+        """Hash a context dict into a short deterministic discriminator.
+        
+        Uses non-cryptographic xxh3_64 (16 hex chars); the hash only
+        separates cache entries and has no security role. orjson with
+        sorted keys gives canonical bytes without an encode step.
+        """
+        context_bytes = orjson.dumps(
+            context, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+        return xxhash.xxh3_64_hexdigest(context_bytes)
+    
+    def _context_digests(self, context: Dict[str, Any]) -> Tuple[str, str]:
+        """Hash a context for both the L2 filter and the L1 key.
+        
+        The L2 filter hashes the full context while the L1 key only hashes
+        the configured context_fields; when those coincide the digest is
+        computed once and shared.
+        
+        Args:
+            context: Non-empty context dictionary
+            
+        Returns:
+            (filter_hash, key_hash); key_hash is "" when no context field
+            is present
+        """
+        filter_hash = self._hash_context(context)
+        ctx_to_hash = context
+        if self.config.context_fields:
+            ctx_to_hash = {
+                k: v for k, v in context.items()
+                if k in self.config.context_fields
+            }
+        
+        if len(ctx_to_hash) == len(context):
+            return filter_hash, filter_hash
+        return filter_hash, self._hash_context(ctx_to_hash) if ctx_to_hash else ""
+    
     def _generate_context_key(
         self,
         prompt: str,
         user_id: Optional[str],
-        context: Optional[Dict[str, Any]]
-    ) -> str:
-        """Generate cache key including context."""
-        key_parts = [prompt]
-        if user_id:
-            key_parts.append(f"user:{user_id}")
+        context: Optional[Dict[str, Any]],
+        _precomputed_ctx_hash: Optional[str] = None,
+    ) -> L1Key:
+        """Generate cache key including context.
+        
+        The key is a small tuple rather than a joined string, so hashing
+        it does not depend on the prompt length. The prompt is reduced to
+        its 64-bit xxh3 digest.
         
+        Args:
+            prompt: User query/prompt
+            user_id: Optional user identifier
+            context: Optional context dictionary
+            _precomputed_ctx_hash: Key hash from _context_digests(), if
+                already computed for this context
+        """
+        context_hash = None
         if context and self.config.enable_context_hashing:
-            # Filter context fields if configured
-            ctx_to_hash = context
-            if self.config.context_fields:
-                ctx_to_hash = {
-                    k: v for k, v in context.items() 
-                    if k in self.config.context_fields
-                }
-            
-            if ctx_to_hash:
+            if _precomputed_ctx_hash is not None:
+                context_hash = _precomputed_ctx_hash
+            else:
+                # Filter context fields if configured
+                ctx_to_hash = context
+                if self.config.context_fields:
+                    ctx_to_hash = {
+                        k: v for k, v in context.items() 
+                        if k in self.config.context_fields
+                    }
                 # Hash context for deterministic key
-                context_str = json.dumps(ctx_to_hash, sort_keys=True)
-                context_hash = hashlib.sha256(context_str.encode()).hexdigest()[:16]
-                key_parts.append(f"ctx:{context_hash}")
+                context_hash = self._hash_context(ctx_to_hash) if ctx_to_hash else None
+        
+        return (
+            xxhash.xxh3_64_intdigest(prompt.encode()),
+            user_id or None,
+            context_hash or None,
+        )
+    
+    def _make_key_fn(self) -> Callable[[str, Optional[str], Optional[str]], L1Key]:
+        """Specialize L1 key generation for a batch.
         
-        return ":".join(key_parts)
+        The returned function builds the same keys as _generate_context_key
+        from a precomputed context key hash, with config lookups hoisted out.
+        
+        Returns:
+            key_fn(prompt, user_id, ctx_hash) -> key
+        """
+        hash_context = self.config.enable_context_hashing
+        prompt_digest = xxhash.xxh3_64_intdigest
+        
+        def key_fn(prompt: str, user_id: Optional[str], ctx_hash: Optional[str]) -> L1Key:
+            return (
+                prompt_digest(prompt.encode()),
+                user_id or None,
+                (ctx_hash or None) if hash_context else None,
+            )
+        
+        return key_fn
+    
+    def _keys_batch(
+        self,
+        prompts: List[str],
+        user_ids: List[Optional[str]],
+        ctx_hashes: List[Optional[str]],
+    ) -> List[L1Key]:
+        """Build L1 keys for a whole batch.
+        
+        Same keys as _generate_context_key with precomputed context key
+        hashes; map() keeps the per-item loop in C.
+        
+        Args:
+            prompts: Prompts in batch order
+            user_ids: User ID for each prompt (or None)
+            ctx_hashes: Context key hash for each prompt (or None)
+            
+        Returns:
+            L1 key for each prompt
+        """
+        return list(map(self._make_key_fn(), prompts, user_ids, ctx_hashes))
+    
+    def _build_query_str(self, filter_expression: Optional[FilterExpression]) -> str:
+        """Build the native RediSearch vector query string.
+        
+        Uses VECTOR_RANGE so the distance threshold is enforced at DB level.
+        
+        Args:
+            filter_expression: Optional filter to prefix the vector clause with
+            
+        Returns:
+            Query string for FT.SEARCH
+        """
+        threshold = float(self.config.distance_threshold)
+        # syntax: @prompt_vector:[VECTOR_RANGE {radius} $blob]=>{$YIELD_DISTANCE_AS: vector_distance}
+        base_query = f"@prompt_vector:[VECTOR_RANGE {threshold} $blob]=>{{$YIELD_DISTANCE_AS: vector_distance}}"
+        if filter_expression:
+            # Prefix filters: (@filter) @vector:[...]
+            return f"({filter_expression}) {base_query}"
+        return base_query
+    
+    @staticmethod
+    def _parse_search_results(raw_results: List[Any]) -> List[Dict[str, Any]]:
+        """Parse a raw FT.SEARCH reply into result dicts.
+        
+        Args:
+            raw_results: Reply of the form [count, key1, [field, val, ...], key2, ...]
+            
+        Returns:
+            List of dicts with response, prompt, vector_distance and metadata
+        """
+        parsed_results = []
+        
+        for i in range(1, len(raw_results), 2):
+            fields_raw = raw_results[i+1]
+            
+            # Convert list [k, v, k, v] to dict
+            doc = {
+                "metadata": {}
+            }
+            
+            for j in range(0, len(fields_raw), 2):
+                # Decode bytes to str
+                f_name = fields_raw[j].decode('utf-8') if isinstance(fields_raw[j], bytes) else fields_raw[j]
+                f_val_raw = fields_raw[j+1]
+                f_val = f_val_raw.decode('utf-8') if isinstance(f_val_raw, bytes) else f_val_raw
+                
+                if f_name == "vector_distance":
+                    doc["vector_distance"] = float(f_val)
+                elif f_name == "prompt":
+                    doc["prompt"] = f_val
+                elif f_name == "response":
+                    doc["response"] = f_val
+                elif f_name == "prompt_vector":
+                    # Skip vector data in output
+                    pass
+                elif f_name == "metadata":
+                    # Stored metadata is a JSON object, as written by store()
+                    try:
+                        doc["metadata"].update(orjson.loads(f_val))
+                    except (orjson.JSONDecodeError, TypeError, ValueError):
+                        doc["metadata"][f_name] = f_val
+                else:
+                    # All other fields go into metadata
+                    doc["metadata"][f_name] = f_val
+            
+            parsed_results.append(doc)
+        
+        return parsed_results
+    
+    async def _batched_l2_check(
+        self,
+        prompts: List[str],
+        filter_expressions: List[Optional[FilterExpression]],
+        num_results: int,
+        return_fields: Optional[List[str]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run the L2 vector searches for several prompts in one round-trip.
+        
+        Uncached prompts are embedded with a single batch call and the
+        FT.SEARCH commands are queued on a non-transactional pipeline.
+        
+        Args:
+            prompts: Prompts to look up
+            filter_expressions: Filter for each prompt (same order)
+            num_results: Number of results per prompt
+            return_fields: Fields to return
+            
+        Returns:
+            Parsed results for each prompt (same order)
+        """
+        # One (N, dim) matrix in the index dtype; each row is already a query blob
+        matrix = await self._embed(prompts)
+        fields = tuple(return_fields) if return_fields else None
+        
+        redis_client = await self._cache._get_async_redis_client()
+        pipe = redis_client.pipeline(transaction=False)
+        for row, filter_expression in zip(matrix, filter_expressions):
+            head, tail = self._search_args(
+                self._build_query_str(filter_expression), num_results, fields
+            )
+            pipe.execute_command(*self._cmd_head, *head, row.tobytes(), *tail)
+        
+        replies = await pipe.execute()
+        return [self._parse_search_results(reply) for reply in replies]
+    
+    async def _embed(self, prompts: List[str]) -> np.ndarray:
+        """Embed prompts as query vectors in the index dtype.
+        
+        Goes through batch_vectorize, so prompts repeated within the call
+        or seen before (including warm_prompts) skip the model, and the
+        rest share vectorizer calls with concurrent checks.
+        
+        Args:
+            prompts: Prompts to embed
+            
+        Returns:
+            Array of shape (len(prompts), dim)
+        """
+        vectors = await batch_vectorize(prompts, self._cache._vectorizer, batcher=self._batcher)
+        return vectors.astype(self._vector_dtype, copy=False)
+    
+    def _search_args(
+        self,
+        query_str: str,
+        num_results: int,
+        return_fields: Optional[Tuple[str, ...]] = None,
+    ) -> Tuple[tuple, tuple]:
+        """Get the static FT.SEARCH arguments around the vector blob.
+        
+        Args:
+            query_str: RediSearch query string
+            num_results: Number of results to retrieve
+            return_fields: Fields to return (defaults to the fields check() reads)
+            
+        Returns:
+            (head, tail) tuples; the blob goes between them
+        """
+        cache_key = (query_str, num_results, return_fields)
+        args = self._search_args_cache.get(cache_key)
+        if args is None:
+            if return_fields is None:
+                fields = self._default_return_fields
+            else:
+                # response, vector_distance and metadata are always needed by check()
+                fields = tuple(dict.fromkeys(("response", "vector_distance", "metadata") + return_fields))
+            args = (
+                (query_str, "PARAMS", "2", "blob"),
+                (
+                    "RETURN", str(len(fields)), *fields,
+                    "SORTBY", "vector_distance", "ASC",
+                    "LIMIT", "0", str(num_results),
+                    # DIALECT 2 is needed for vector search
+                    "DIALECT", "2",
+                ),
+            )
+            self._search_args_cache[cache_key] = args
+        return args
     
     def _build_filter_expression(
         self,
         user_id: Optional[str],
         filters: Optional[Dict[str, Any]]
     ) -> Optional[FilterExpression]:
-        """Build filter expression for cache queries."""
+        """Build filter expression for cache queries.
+        
+        Expressions are memoized per (user_id, filters) since a batch
+        usually repeats the same few filter shapes.
+        """
         if not user_id and not filters:
             return None
         
+        try:
+            cache_key = (user_id, frozenset(filters.items()) if filters else None)
+            expression = self._filter_expr_cache.get(cache_key)
+        except TypeError:
+            # Unhashable filter values are built without memoization
+            return self._compose_filter_expression(user_id, filters)
+        
+        if expression is None:
+            expression = self._compose_filter_expression(user_id, filters)
+            self._filter_expr_cache[cache_key] = expression
+        return expression
+    
+    @staticmethod
+    def _compose_filter_expression(
+        user_id: Optional[str],
+        filters: Optional[Dict[str, Any]]
+    ) -> Optional[FilterExpression]:
+        """Compose Tag filters for user_id and filters with AND."""
         filter_parts = []
         if user_id:
             filter_parts.append(Tag("user_id") == user_id)
@@ -12,6 +12,26 @@ class L1CacheConfig(BaseModel):
     max_size: int = Field(default=1000)
     ttl_seconds: int = Field(default=300)
     eviction_strategy: Literal["lru", "lfu", "ttl"] = Field(default="lru")
+    track_access: bool = Field(default=False)
+    admission_probability: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description="Probability of promoting an L2 hit into L1 (q-LRU admission); lower values keep one-shot prompts from evicting hot entries"
+    )
+    shards: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Number of independently locked L1 shards (default: derived from CPU count and max_size)"
+    )
+
+
+class NegativeCacheConfig(BaseModel):
+    """Configuration for the in-memory cache of known L2 misses."""
+    
+    enabled: bool = Field(default=False)
+    capacity: int = Field(default=10000, ge=1)
+    ttl_seconds: int = Field(default=60, ge=1)
 
 
 class ObservabilityConfig(BaseModel):
@@ -44,6 +64,11 @@ class ObservabilityConfig(BaseModel):
         default="semantic_cache",
         description="Prefix for Prometheus metrics"
     )
+    prometheus_cache_seconds: float = Field(
+        default=0.0,
+        ge=0,
+        description="Seconds to reuse a rendered Prometheus export across scrapes (0 renders every call)"
+    )
     
     # Logging
     enable_correlation_id: bool = Field(
@@ -61,7 +86,7 @@ class VectorizerConfig(BaseModel):
     
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
-    provider: Literal["huggingface", "openai", "cohere", "vertexai", "voyageai", "custom"] = Field(
+    provider: Literal["huggingface", "onnx", "openai", "cohere", "vertexai", "voyageai", "custom"] = Field(
         default="huggingface",
         description="Vectorizer provider"
     )
@@ -71,12 +96,16 @@ class VectorizerConfig(BaseModel):
     )
     dtype: str = Field(
         default="float32",
-        description="Data type for embeddings"
+        description="Data type for embeddings (\"int8\" quantizes float32 output)"
     )
     dims: Optional[int] = Field(
         default=None,
         description="Embedding dimensions (auto-detected if None)"
     )
+    device: Optional[str] = Field(
+        default=None,
+        description="Device for local HuggingFace models, e.g. \"cuda\", \"mps\", \"cpu\" (auto-detected if None)"
+    )
     api_config: Optional[Dict[str, Any]] = Field(
         default=None,
         description="API configuration for cloud-based vectorizers"
@@ -85,7 +114,7 @@ class VectorizerConfig(BaseModel):
     @field_validator("provider")
     @classmethod
     def validate_provider(cls, v: str) -> str:
-        valid_providers = ["huggingface", "openai", "cohere", "vertexai", "voyageai", "custom"]
+        valid_providers = ["huggingface", "onnx", "openai", "cohere", "vertexai", "voyageai", "custom"]
         if v not in valid_providers:
             raise ValueError(f"Provider must be one of {valid_providers}")
         return v
@@ -223,6 +252,16 @@ class CacheConfig(BaseModel):
         default=None,
         description="Optional async callback for refreshing stale entries: async def callback(prompt, user_id, context) -> str"
     )
+    stale_refresh_queue_size: int = Field(
+        default=1024,
+        ge=1,
+        description="Maximum pending background refreshes; further stale hits are dropped"
+    )
+    stale_refresh_workers: int = Field(
+        default=2,
+        ge=1,
+        description="Number of background workers draining the refresh queue"
+    )
     
     # Retry configuration
     max_retries: int = Field(
@@ -244,6 +283,27 @@ class CacheConfig(BaseModel):
     # L1 Cache
     l1_cache: L1CacheConfig = Field(default_factory=L1CacheConfig)
     
+    # Negative cache (skip embedding + L2 for prompts that just missed)
+    negative_cache: NegativeCacheConfig = Field(default_factory=NegativeCacheConfig)
+    
+    # Embedding batching (concurrent cache misses share one vectorizer call)
+    embedding_max_batch: int = Field(
+        default=64,
+        ge=1,
+        description="Maximum prompts per coalesced embedding call"
+    )
+    embedding_batch_window_ms: float = Field(
+        default=0.0,
+        ge=0.0,
+        description="Extra time to wait for more prompts before embedding; 0 only batches prompts already queued"
+    )
+    
+    # Cache warming
+    warm_prompts: List[str] = Field(
+        default_factory=list,
+        description="Prompts embedded during initialize() into the embedding cache check() reads, so their first lookups skip the model"
+    )
+    
     # Context-aware caching
     enable_context_hashing: bool = Field(default=True)
     context_fields: List[str] = Field(
@@ -263,6 +323,11 @@ class CacheConfig(BaseModel):
         ge=1,
         description="Redis connection pool size"
     )
+    max_concurrent_l2: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Maximum concurrent L2 lookups in batch_check (defaults to connection_pool_size)"
+    )
     
     # Logging
     log_level: str = Field(
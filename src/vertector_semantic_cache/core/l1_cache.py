@@ -1,71 +1,288 @@
-from typing import Optional, Dict, Any, Union
-from cachetools import LRUCache, LFUCache, TTLCache
+from typing import Optional, Dict, Any, Union, List, Hashable
+from array import array
+from collections import OrderedDict
+from cachetools import LFUCache
+import os
+import random
 import threading
+import time
+import weakref
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from vertector_semantic_cache.utils.logging import get_logger
 
 logger = get_logger("core.l1_cache")
 
-@dataclass
+# L1Cache uses non-reentrant shard locks: no method may call another
+# locked method while holding one of self._locks.
+
+@dataclass(slots=True)
 class L1CacheEntry:
     """Entry stored in L1 cache."""
     response: str
     metadata: Optional[Dict[str, Any]]
-    cached_at: datetime
-    access_count: int = 0
+    cached_at_ns: int  # time.time_ns() when cached
+    
+    @property
+    def cached_at(self) -> datetime:
+        """Time the entry was cached (UTC)."""
+        return datetime.fromtimestamp(self.cached_at_ns / 1e9, tz=timezone.utc)
+
+class _FastLRUCache:
+    """Minimal LRU mapping backed directly by a C OrderedDict.
+    
+    cachetools.LRUCache routes every lookup through several Python-level
+    __contains__/__getitem__ frames; this keeps a hit to one dict lookup
+    plus one move_to_end.
+    """
+    
+    __slots__ = ("_data", "maxsize")
+    
+    def __init__(self, maxsize: int):
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.maxsize = maxsize
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        data = self._data
+        try:
+            value = data[key]
+        except KeyError:
+            return default
+        data.move_to_end(key)
+        return value
+    
+    def get_many(self, keys: List[Hashable]) -> List[Any]:
+        """Look up all keys, then mark the hits as recently used."""
+        data = self._data
+        values = [data.get(key) for key in keys]
+        for key, value in zip(keys, values):
+            if value is not None:
+                data.move_to_end(key)
+        return values
+    
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        data = self._data
+        data[key] = value
+        data.move_to_end(key)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self._data.pop(key, default)
+    
+    def expire(self, cutoff_ns: int) -> int:
+        """Drop entries cached before cutoff_ns; returns how many."""
+        data = self._data
+        expired = [key for key, entry in data.items() if entry.cached_at_ns < cutoff_ns]
+        for key in expired:
+            del data[key]
+        return len(expired)
+    
+    def clear(self) -> None:
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+# Shards hold at least this many entries so per-shard eviction stays a
+# reasonable approximation of global eviction
+_MIN_SHARD_SIZE = 64
+
+# Lossy access counter slots per shard (see L1Cache.access_count)
+_ACCESS_SLOTS = 64
+
+def _default_shard_count(max_size: int) -> int:
+    """Pick a shard count from the CPU count, capped by cache size."""
+    shards = min(32, (os.cpu_count() or 1) * 4)
+    return max(1, min(shards, max_size // _MIN_SHARD_SIZE))
 
 class L1Cache:
-    """In-memory L1 cache with configurable eviction."""
+    """In-memory L1 cache with configurable eviction.
+    
+    Keys are spread over independently locked shards by hash(key), so
+    concurrent lookups from different threads rarely contend. Eviction
+    is applied per shard.
+    
+    The "ttl" strategy is LRU plus expiry: lookups check each entry's
+    cached_at_ns, and a daemon thread sweeps expired entries out in the
+    background instead of on every access.
+    """
     
     def __init__(
         self,
         max_size: int = 1000,
         ttl_seconds: int = 300,
-        strategy: str = "lru"  # lru, lfu, ttl
+        strategy: str = "lru",  # lru, lfu, ttl
+        track_access: bool = False,
+        admission_probability: float = 1.0,
+        shards: Optional[int] = None
     ):
-        self._lock = threading.RLock()
+        if strategy not in ("lru", "lfu", "ttl"):
+            raise ValueError(f"Unknown strategy: {strategy}")
+        
         self.strategy = strategy
+        self._admission_probability = admission_probability
+        # LRU and TTL shards are _FastLRUCache; TTL additionally expires entries
+        self._fast = strategy != "lfu"
+        self._ttl_ns = ttl_seconds * 1_000_000_000 if strategy == "ttl" else 0
         
-        if strategy == "lru":
-            self._cache: Union[LRUCache, LFUCache, TTLCache] = LRUCache(maxsize=max_size)
-        elif strategy == "lfu":
-            self._cache = LFUCache(maxsize=max_size)
-        elif strategy == "ttl":
-            self._cache = TTLCache(maxsize=max_size, ttl=ttl_seconds)
-        else:
-            raise ValueError(f"Unknown strategy: {strategy}")
+        n = shards or _default_shard_count(max_size)
+        self._num_shards = n
+        self._locks = [threading.Lock() for _ in range(n)]
+        # Approximate hit counters, bumped outside the shard lock so reads
+        # never write to the entry itself
+        self._access_counts: Optional[List[array]] = (
+            [array("Q", bytes(8 * _ACCESS_SLOTS)) for _ in range(n)]
+            if track_access else None
+        )
+        self._shards: List[Union[_FastLRUCache, LFUCache]] = []
+        for i in range(n):
+            # Spread max_size across shards; the first max_size % n get one extra
+            shard_size = max(1, max_size // n + (1 if i < max_size % n else 0))
+            if self._fast:
+                self._shards.append(_FastLRUCache(maxsize=shard_size))
+            else:
+                self._shards.append(LFUCache(maxsize=shard_size))
+        
+        if self._ttl_ns:
+            self._start_sweeper(interval=min(ttl_seconds / 10, 30.0))
             
-        logger.info(f"Initialized L1 Cache (strategy={strategy}, max_size={max_size}, ttl={ttl_seconds}s)")
+        logger.info(
+            f"Initialized L1 Cache (strategy={strategy}, max_size={max_size}, "
+            f"ttl={ttl_seconds}s, shards={n})"
+        )
     
-    def get(self, key: str) -> Optional[L1CacheEntry]:
+    def get(self, key: Hashable) -> Optional[L1CacheEntry]:
         """Get from L1 cache."""
-        with self._lock:
-            entry = self._cache.get(key)
-            if entry:
-                entry.access_count += 1
-                logger.debug(f"L1 HIT for key: {key}")
-            else:
-                logger.debug(f"L1 MISS for key: {key}")
-            return entry
+        h = hash(key)
+        i = h % self._num_shards
+        with self._locks[i]:
+            entry = self._shards[i].get(key)
+            if entry is not None and self._ttl_ns and entry.cached_at_ns < time.time_ns() - self._ttl_ns:
+                self._shards[i].pop(key, None)
+                entry = None
+        if entry is not None and self._access_counts is not None:
+            self._access_counts[i][(h // self._num_shards) % _ACCESS_SLOTS] += 1
+        logger.debug("L1 %s for key: %s", "HIT" if entry is not None else "MISS", key)
+        return entry
+    
+    def get_many(self, keys: List[Hashable]) -> List[Optional[L1CacheEntry]]:
+        """Get several keys from L1 cache, taking each shard lock once."""
+        n = self._num_shards
+        entries: List[Optional[L1CacheEntry]] = [None] * len(keys)
+        cutoff_ns = time.time_ns() - self._ttl_ns if self._ttl_ns else 0
+        
+        # Group key positions by shard
+        hashes = [hash(key) for key in keys]
+        by_shard: Dict[int, List[int]] = {}
+        for pos, h in enumerate(hashes):
+            by_shard.setdefault(h % n, []).append(pos)
+        
+        for i, positions in by_shard.items():
+            shard = self._shards[i]
+            shard_keys = [keys[pos] for pos in positions]
+            with self._locks[i]:
+                if self._fast:
+                    shard_entries = shard.get_many(shard_keys)
+                else:
+                    shard_entries = [shard.get(key) for key in shard_keys]
+                if cutoff_ns:
+                    for j, entry in enumerate(shard_entries):
+                        if entry is not None and entry.cached_at_ns < cutoff_ns:
+                            shard.pop(shard_keys[j], None)
+                            shard_entries[j] = None
+            counts = self._access_counts[i] if self._access_counts is not None else None
+            for pos, entry in zip(positions, shard_entries):
+                entries[pos] = entry
+                if counts is not None and entry is not None:
+                    counts[(hashes[pos] // n) % _ACCESS_SLOTS] += 1
+        
+        logger.debug("L1 get_many for %d keys", len(keys))
+        return entries
+    
+    def access_count(self, key: Hashable) -> int:
+        """Approximate number of hits for key since startup.
+        
+        Counters are shared by keys that fall in the same slot and are
+        updated without locking, so the value is an estimate. Returns 0
+        when track_access is disabled.
+        """
+        if self._access_counts is None:
+            return 0
+        h = hash(key)
+        n = self._num_shards
+        return self._access_counts[h % n][(h // n) % _ACCESS_SLOTS]
     
-    def set(self, key: str, entry: L1CacheEntry) -> None:
+    def set(self, key: Hashable, entry: L1CacheEntry) -> None:
         """Set in L1 cache."""
-        with self._lock:
-            self._cache[key] = entry
-            logger.debug(f"L1 SET key: {key}")
+        i = hash(key) % self._num_shards
+        with self._locks[i]:
+            self._shards[i][key] = entry
+        logger.debug("L1 SET key: %s", key)
     
-    def invalidate(self, key: str) -> None:
+    def offer(self, key: Hashable, entry: L1CacheEntry) -> bool:
+        """Offer an L2 hit for promotion into L1.
+        
+        The entry is admitted with probability admission_probability, so
+        prompts seen only once rarely displace entries that are reused.
+        
+        Returns:
+            True if the entry was admitted
+        """
+        if self._admission_probability < 1.0 and random.random() >= self._admission_probability:
+            logger.debug("L1 admission rejected key: %s", key)
+            return False
+        self.set(key, entry)
+        return True
+    
+    def invalidate(self, key: Hashable) -> None:
         """Remove from L1 cache."""
-        with self._lock:
-            self._cache.pop(key, None)
+        i = hash(key) % self._num_shards
+        with self._locks[i]:
+            self._shards[i].pop(key, None)
+    
+    def _start_sweeper(self, interval: float) -> None:
+        """Start a daemon thread that periodically drops expired entries.
+        
+        The thread only holds a weak reference, so it exits once the cache
+        is garbage collected.
+        """
+        cache_ref = weakref.ref(self)
+        stop = threading.Event()
+        self._sweeper_stop = stop
+        
+        def _sweep_loop() -> None:
+            while not stop.wait(interval):
+                cache = cache_ref()
+                if cache is None:
+                    return
+                cache._sweep()
+                del cache
+        
+        threading.Thread(target=_sweep_loop, name="l1-ttl-sweeper", daemon=True).start()
+    
+    def _sweep(self) -> None:
+        """Remove expired entries from every shard."""
+        cutoff_ns = time.time_ns() - self._ttl_ns
+        expired = 0
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                expired += shard.expire(cutoff_ns)
+        if expired:
+            logger.debug("L1 sweep expired %d entries", expired)
+    
+    def close(self) -> None:
+        """Stop the background TTL sweeper, if any."""
+        stop = getattr(self, "_sweeper_stop", None)
+        if stop is not None:
+            stop.set()
     
     def clear(self) -> None:
         """Clear all entries."""
-        with self._lock:
-            self._cache.clear()
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
             
     def __len__(self) -> int:
-        """Get current size."""
-        with self._lock:
-            return len(self._cache)
+        """Get current size (approximate under concurrent writes)."""
+        return sum(len(shard) for shard in self._shards)
@@ -1,361 +1,912 @@
 """Cache performance metrics tracking."""
 
-from dataclasses import dataclass, field
-from typing import Dict, Any, List
+import asyncio
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Any, Iterator, List, Mapping, Optional, Sequence, Tuple
 from datetime import datetime, timezone
+import itertools
+import os
 import threading
-from collections import defaultdict
+import time
+import warnings
+from types import MappingProxyType
+
+import numpy as np
+
+
+class LogLinearHistogram:
+    """Fixed-size log-linear histogram (circllhist-style).
+    
+    Values are bucketed by decimal exponent and two significant digits,
+    i.e. 90 bins per decade, so any quantile is within 10% of the true
+    value while memory stays constant. Recording never allocates.
+    
+    Bins are closed at the top (lower, upper], matching Prometheus' ``le``
+    buckets: a value exactly on an edge counts towards that bound.
+    
+    The range covers 0.001 to 100000 (e.g. milliseconds); smaller values
+    fall into an underflow bin and larger ones into an overflow bin.
+    """
+    
+    MIN_EXP = -3
+    MAX_EXP = 4
+    BINS_PER_DECADE = 90
+    NUM_BINS = (MAX_EXP - MIN_EXP + 1) * BINS_PER_DECADE + 2
+    
+    # Lower edge of each bin (underflow, 90 per decade, overflow)
+    _LOWER = np.array(
+        [0.0]
+        + [
+            (10 + m) / 10 * 10.0 ** e
+            for e, m in itertools.product(range(MIN_EXP, MAX_EXP + 1), range(BINS_PER_DECADE))
+        ]
+        + [10.0 ** (MAX_EXP + 1)]
+    )
+    _UPPER = np.append(_LOWER[1:], np.inf)
+    _UPPER_LIST = _UPPER.tolist()
+    _MID = np.append((_LOWER[:-1] + _UPPER[:-1]) / 2, _LOWER[-1])
+    
+    __slots__ = ("_bins", "count", "total")
+    
+    def __init__(self) -> None:
+        self._bins = np.zeros(self.NUM_BINS, dtype=np.uint32)
+        self.count = 0
+        self.total = 0.0
+    
+    @classmethod
+    def _index(cls, value: float) -> int:
+        """Get the bin index for value (first bin whose upper edge is >= value)."""
+        return bisect_left(cls._UPPER_LIST, value)
+    
+    def record(self, value: float) -> None:
+        """Record a single value."""
+        self._bins[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+    
+    def record_many(self, values: Sequence[float]) -> None:
+        """Record several values."""
+        for value in values:
+            self.record(value)
+    
+    def mean(self) -> float:
+        """Mean of recorded values (exact)."""
+        return self.total / self.count if self.count else 0.0
+    
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0 <= q <= 1) from bin midpoints."""
+        if not self.count:
+            return 0.0
+        cumulative = np.cumsum(self._bins)
+        idx = int(np.searchsorted(cumulative, q * self.count))
+        return float(self._MID[min(idx, self.NUM_BINS - 1)])
+    
+    def cumulative_counts(self, bounds: Sequence[float]) -> List[int]:
+        """Count values <= each bound (bounds should fall on bin edges)."""
+        cumulative = np.cumsum(self._bins)
+        counts = []
+        for bound in bounds:
+            # Bins whose upper edge is <= bound are fully below it
+            n = int(np.searchsorted(self._UPPER, bound, side="right"))
+            counts.append(int(cumulative[n - 1]) if n else 0)
+        return counts
+    
+    def copy(self) -> "LogLinearHistogram":
+        """Get an independent copy of this histogram."""
+        other = LogLinearHistogram.__new__(LogLinearHistogram)
+        other._bins = self._bins.copy()
+        other.count = self.count
+        other.total = self.total
+        return other
+    
+    def reset(self) -> None:
+        """Clear all recorded values."""
+        self._bins.fill(0)
+        self.count = 0
+        self.total = 0.0
+
+
+class LatencyRing:
+    """Fixed-size circular buffer of the most recent latencies.
+    
+    Inserts overwrite the oldest value in place, so recording never
+    allocates. Used for a recent-window average alongside the cumulative
+    histograms.
+    """
+    
+    __slots__ = ("_values", "_idx", "_filled")
+    
+    def __init__(self, size: int = 1000) -> None:
+        self._values = np.zeros(size, dtype=np.float32)
+        self._idx = 0
+        self._filled = False
+    
+    def append(self, value: float) -> None:
+        """Record one value, overwriting the oldest when full."""
+        self._values[self._idx] = value
+        self._idx = (self._idx + 1) % len(self._values)
+        if self._idx == 0:
+            self._filled = True
+    
+    def extend(self, values: Sequence[float]) -> None:
+        """Record several values."""
+        size = len(self._values)
+        values = np.asarray(values, dtype=np.float32)[-size:]
+        n = len(values)
+        if n == 0:
+            return
+        # Write in at most two slices around the wrap point
+        first = min(n, size - self._idx)
+        self._values[self._idx:self._idx + first] = values[:first]
+        self._values[:n - first] = values[first:]
+        end = self._idx + n
+        if end >= size:
+            self._filled = True
+        self._idx = end % size
+    
+    def mean(self) -> float:
+        """Mean of the values currently held."""
+        if self._filled:
+            return float(self._values.mean())
+        if self._idx == 0:
+            return 0.0
+        return float(self._values[:self._idx].mean())
+    
+    def values(self) -> np.ndarray:
+        """Copy of the values currently held, oldest first."""
+        if self._filled:
+            return np.concatenate((self._values[self._idx:], self._values[:self._idx]))
+        return self._values[:self._idx].copy()
+    
+    def reset(self) -> None:
+        """Clear all recorded values."""
+        self._idx = 0
+        self._filled = False
+
+
+# Prometheus bucket bounds for latency histograms (milliseconds)
+_LATENCY_BUCKETS_MS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+_LATENCY_BUCKET_LABELS = tuple(str(bound).encode() for bound in _LATENCY_BUCKETS_MS)
+
+
+def _prom_header(name: str, help_text: str, metric_type: str, sample: bool = True) -> bytes:
+    """Build the constant HELP/TYPE lines (and sample name) for a metric."""
+    header = f"# HELP {name} {help_text}\n# TYPE {name} {metric_type}\n"
+    if sample:
+        header += f"{name} "
+    return header.encode()
+
+
+def _prom_histogram_template(name: str, help_text: str) -> bytes:
+    """Build the format template for one latency histogram block."""
+    lines = [_prom_header(name, help_text, "histogram", sample=False)]
+    for label in _LATENCY_BUCKET_LABELS:
+        lines.append(b'%s_bucket{le="%s"} %%d\n' % (name.encode(), label))
+    lines.append(b'%s_bucket{le="+Inf"} %%d\n%s_sum %%r\n%s_count %%d\n\n' % ((name.encode(),) * 3))
+    return b"".join(lines)
+
+
+# Format template for every fixed-label metric, in export order. Counters
+# use %d, gauges %r; only the values change between scrapes.
+_PROM_TEMPLATE = b"".join((
+    # Overall metrics
+    _prom_header("semantic_cache_queries_total", "Total number of cache queries", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_hits_total", "Total number of cache hits", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_misses_total", "Total number of cache misses", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_hit_rate", "Cache hit rate percentage", "gauge"), b"%r\n\n",
+    # L1 metrics
+    _prom_header("semantic_cache_l1_hits_total", "Total L1 cache hits", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_l1_misses_total", "Total L1 cache misses", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_l1_hit_rate", "L1 cache hit rate percentage", "gauge"), b"%r\n\n",
+    _prom_header("semantic_cache_l1_latency_ms", "Average L1 latency in milliseconds", "gauge"), b"%r\n\n",
+    # L2 metrics
+    _prom_header("semantic_cache_l2_hits_total", "Total L2 cache hits", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_l2_misses_total", "Total L2 cache misses", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_l2_hit_rate", "L2 cache hit rate percentage", "gauge"), b"%r\n\n",
+    _prom_header("semantic_cache_l2_latency_ms", "Average L2 latency in milliseconds", "gauge"), b"%r\n\n",
+    _prom_header("semantic_cache_negative_cache_hits_total", "Lookups skipped by the negative cache", "counter"), b"%d\n\n",
+    # Other metrics
+    _prom_header("semantic_cache_llm_calls_avoided", "Total LLM calls avoided", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_errors_total", "Total number of errors", "counter"), b"%d\n\n",
+    _prom_header("semantic_cache_rerank_operations_total", "Total rerank operations", "counter"), b"%d\n\n",
+    # Latency histograms
+    _prom_histogram_template("semantic_cache_l1_latency_histogram_ms", "L1 lookup latency distribution in milliseconds"),
+    _prom_histogram_template("semantic_cache_l2_latency_histogram_ms", "L2 lookup latency distribution in milliseconds"),
+))
+_PROM_CONTEXT_HEADER = _prom_header(
+    "semantic_cache_context_hits_total", "Cache hits by context type", "counter", sample=False
+)
+_PROM_TAG_HEADER = _prom_header(
+    "semantic_cache_tag_invalidations_total", "Tag invalidations", "counter", sample=False
+)
+
+
+class SpaceSavingCounter:
+    """Counter that tracks at most k keys (Space-Saving top-K).
+    
+    When a new key arrives while k keys are tracked, the least-counted key
+    is evicted and its count folded into an ``_other`` bucket, so frequent
+    keys stay labelled while memory and label cardinality stay bounded.
+    Counts always sum to the total recorded.
+    
+    Not thread-safe; callers hold the metrics lock.
+    """
+    
+    OTHER = "_other"
+    
+    __slots__ = ("k", "_counts", "other", "_view")
+    
+    def __init__(self, k: int = 128) -> None:
+        self.k = k
+        self._counts: Dict[str, int] = {}
+        self.other = 0
+        self._view: Optional[Mapping[str, int]] = None
+    
+    def add(self, key: str, count: int = 1) -> None:
+        """Add count to key, evicting the smallest key if full."""
+        self._view = None
+        counts = self._counts
+        if key in counts:
+            counts[key] += count
+        elif len(counts) < self.k:
+            counts[key] = count
+        else:
+            victim = min(counts, key=counts.__getitem__)
+            self.other += counts.pop(victim)
+            counts[key] = count
+    
+    def view(self) -> Mapping[str, int]:
+        """Get a read-only snapshot of the counts, including ``_other``.
+        
+        The snapshot is reused until the next write, so repeated exports
+        of an unchanged counter do not copy it.
+        """
+        if self._view is None:
+            counts = dict(self._counts)
+            if self.other:
+                counts[self.OTHER] = self.other
+            self._view = MappingProxyType(counts)
+        return self._view
+    
+    def clear(self) -> None:
+        """Forget all counts."""
+        self._counts.clear()
+        self.other = 0
+        self._view = None
+    
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+class _CounterStripe:
+    """One cell of the striped hot-path counters.
+    
+    Each thread increments its own stripe without locking; readers sum
+    all stripes. Under the GIL an increment can only be lost if two
+    threads share a stripe and are switched mid-update, which is an
+    acceptable error for metrics.
+    """
+    
+    __slots__ = (
+        "total_queries",
+        "cache_hits",
+        "cache_misses",
+        "llm_calls_avoided",
+        "latency_saved_ns",
+        "l1_hits",
+        "l1_misses",
+        "l2_hits",
+        "l2_misses",
+        "l1_total",
+        "l2_total",
+        "errors",
+        "rerank_operations",
+        "negative_cache_hits",
+        "stale_refused_count",
+        "version_mismatches",
+        "refresh_dropped_count",
+    )
+    
+    def __init__(self) -> None:
+        self.reset()
+    
+    def reset(self) -> None:
+        """Zero every counter in this stripe."""
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+
+def _striped_counter(name: str, doc: str, total: Optional[str] = None, scale: float = 1) -> property:
+    """Build a CacheMetrics property that sums a striped counter.
+    
+    Assigning sets the total by adding the difference to the caller's
+    stripe (and to the ``total`` counter, e.g. l1_total for l1_hits), so
+    ``metrics.cache_hits = 0`` and ``+=`` keep working. ``scale`` converts
+    the stored integer to the public unit.
+    """
+    def fget(self: "CacheMetrics"):
+        value = self._sum(name)
+        return value / scale if scale != 1 else value
+    
+    def fset(self: "CacheMetrics", value) -> None:
+        delta = int(round(value * scale)) - self._sum(name)
+        stripe = self._stripe()
+        setattr(stripe, name, getattr(stripe, name) + delta)
+        if total is not None:
+            setattr(stripe, total, getattr(stripe, total) + delta)
+    
+    return property(fget, fset, doc=doc)
 
 
 @dataclass
+class _MetricsSnapshot:
+    """Point-in-time copy of CacheMetrics used for export."""
+    
+    totals: _CounterStripe
+    errors: int
+    rerank_operations: int
+    negative_cache_hits: int
+    stale_served_count: int
+    stale_refused_count: int
+    version_mismatches: int
+    total_age_seconds: float
+    refresh_dropped_count: int
+    context_hits: Mapping[str, int]
+    tag_invalidations: Mapping[str, int]
+    l1_latency_hist: LogLinearHistogram
+    l2_latency_hist: LogLinearHistogram
+    l1_recent_latency_ms: float
+    l2_recent_latency_ms: float
+
+
+# Derived CacheMetrics properties that can't be passed to __init__
+_READ_ONLY_PROPERTIES = frozenset({
+    "hit_rate",
+    "cost_savings_percentage",
+    "average_latency_saved",
+    "stale_served_count",
+    "average_stale_age_seconds",
+    "error_rate",
+    "l1_latencies",
+    "l2_latencies",
+})
+
+
 class CacheMetrics:
     """Thread-safe metrics tracking for cache performance."""
     
-    total_queries: int = 0
-    cache_hits: int = 0
-    cache_misses: int = 0
-    total_latency_saved: float = 0.0
-    llm_calls_avoided: int = 0
-    errors: int = 0
-    rerank_operations: int = 0
-    
-    # L1/L2 breakdown
-    l1_hits: int = 0
-    l1_misses: int = 0
-    l2_hits: int = 0
-    l2_misses: int = 0
-    
-    # Staleness tracking (MUST be initialized here!)
-    _stale_served_count: int = 0
-    _stale_refused_count: int = 0
-    _version_mismatches: int = 0
-    _total_age_seconds: float = 0.0
-    
-    # Context and tag metrics
-    context_hits: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
-    tag_invalidations: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
-    
-    # Latency tracking
-    l1_latencies: List[float] = field(default_factory=list)
-    l2_latencies: List[float] = field(default_factory=list)
-    
-    # Lock for thread-safe operations (use RLock to allow reentrant locking)
-    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
-    
-    def increment_query(self) -> None:
+    __slots__ = (
+        "prometheus_cache_seconds",
+        "_stale_served_count",
+        "_total_age_seconds",
+        "context_hits",
+        "tag_invalidations",
+        "l1_latency_hist",
+        "l2_latency_hist",
+        "_l1_recent",
+        "_l2_recent",
+        "_prom_cached",
+        "_l1_lock",
+        "_l2_lock",
+        "_counter_lock",
+        "_stale_lock",
+        "_stripes",
+        "_stripe_ids",
+        "_local",
+    )
+    
+    def __init__(self, prometheus_cache_seconds: float = 0.0, **counters: float) -> None:
+        """
+        Initialize metrics.
+        
+        Args:
+            prometheus_cache_seconds: Seconds a rendered Prometheus export
+                is reused (0, the default, renders on every call)
+            **counters: Initial counter values, e.g. ``cache_hits=3`` (the
+                keyword arguments the former dataclass accepted)
+        """
+        self.prometheus_cache_seconds = prometheus_cache_seconds
+        
+        # Staleness tracking (count and total age are updated together)
+        self._stale_served_count = 0
+        self._total_age_seconds = 0.0
+        
+        # Context and tag metrics (bounded to the top-K keys)
+        self.context_hits = SpaceSavingCounter()
+        self.tag_invalidations = SpaceSavingCounter()
+        
+        # Latency tracking (milliseconds)
+        self.l1_latency_hist = LogLinearHistogram()
+        self.l2_latency_hist = LogLinearHistogram()
+        
+        # Last 1000 latencies per tier (milliseconds)
+        self._l1_recent = LatencyRing()
+        self._l2_recent = LatencyRing()
+        
+        # Last Prometheus export as (monotonic time, streamed bytes, to_prometheus text)
+        self._prom_cached: Optional[Tuple[float, bytes, str]] = None
+        
+        # One lock per metric partition so unrelated recorders don't contend.
+        # When several are needed they are taken in this order.
+        self._l1_lock = threading.Lock()
+        self._l2_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._stale_lock = threading.Lock()
+        
+        # Striped hot-path counters, one stripe per thread (round-robin)
+        self._stripes = [_CounterStripe() for _ in range(os.cpu_count() or 8)]
+        self._stripe_ids = itertools.count()
+        self._local = threading.local()
+        
+        for name, value in counters.items():
+            if not isinstance(getattr(CacheMetrics, name, None), property) or name in _READ_ONLY_PROPERTIES:
+                raise TypeError(f"CacheMetrics() got an unexpected keyword argument '{name}'")
+            setattr(self, name, value)
+    
+    def _stripe(self) -> _CounterStripe:
+        """Get the calling thread's counter stripe."""
+        try:
+            return self._local.stripe
+        except AttributeError:
+            stripe = self._stripes[next(self._stripe_ids) % len(self._stripes)]
+            self._local.stripe = stripe
+            return stripe
+    
+    def _totals(self) -> _CounterStripe:
+        """Sum all counter stripes (without locking)."""
+        totals = _CounterStripe()
+        for stripe in self._stripes:
+            for name in _CounterStripe.__slots__:
+                setattr(totals, name, getattr(totals, name) + getattr(stripe, name))
+        return totals
+    
+    def _sum(self, name: str) -> int:
+        """Sum a single counter across stripes."""
+        return sum(getattr(stripe, name) for stripe in self._stripes)
+    
+    # Striped counters; assignable for compatibility with the former dataclass fields
+    total_queries = _striped_counter("total_queries", "Total number of queries.")
+    cache_hits = _striped_counter("cache_hits", "Total number of cache hits.")
+    cache_misses = _striped_counter("cache_misses", "Total number of cache misses.")
+    llm_calls_avoided = _striped_counter("llm_calls_avoided", "Number of LLM calls avoided by hits.")
+    l1_hits = _striped_counter("l1_hits", "Number of L1 hits.", total="l1_total")
+    l1_misses = _striped_counter("l1_misses", "Number of L1 misses.", total="l1_total")
+    l2_hits = _striped_counter("l2_hits", "Number of L2 hits.", total="l2_total")
+    l2_misses = _striped_counter("l2_misses", "Number of L2 misses.", total="l2_total")
+    errors = _striped_counter("errors", "Number of errors.")
+    rerank_operations = _striped_counter("rerank_operations", "Number of rerank operations.")
+    negative_cache_hits = _striped_counter("negative_cache_hits", "Number of lookups skipped by the negative cache.")
+    
+    def increment_query(self, count: int = 1) -> None:
         """Increment total query count."""
-        with self._lock:
-            self.total_queries += 1
+        self._stripe().total_queries += count
     
     def record_hit(self, latency_saved: float = 0.0) -> None:
         """Record a cache hit."""
-        with self._lock:
-            self.cache_hits += 1
-            self.llm_calls_avoided += 1
-            self.total_latency_saved += latency_saved
+        self.record_hit_ns(int(latency_saved * 1e9))
     
-    def record_miss(self) -> None:
+    def record_hit_ns(self, latency_saved_ns: int = 0) -> None:
+        """Record a cache hit with latency in nanoseconds."""
+        stripe = self._stripe()
+        stripe.cache_hits += 1
+        stripe.llm_calls_avoided += 1
+        stripe.latency_saved_ns += latency_saved_ns
+    
+    def record_hits(self, latencies_saved: List[float]) -> None:
+        """Record several cache hits at once (one latency per hit)."""
+        if not latencies_saved:
+            return
+        stripe = self._stripe()
+        stripe.cache_hits += len(latencies_saved)
+        stripe.llm_calls_avoided += len(latencies_saved)
+        stripe.latency_saved_ns += int(sum(latencies_saved) * 1e9)
+    
+    def record_miss(self, count: int = 1) -> None:
         """Record a cache miss."""
-        with self._lock:
-            self.cache_misses += 1
+        self._stripe().cache_misses += count
     
     def record_error(self) -> None:
         """Record an error."""
-        with self._lock:
-            self.errors += 1
+        self._stripe().errors += 1
     
     def record_rerank(self) -> None:
         """Record a rerank operation."""
-        with self._lock:
-            self.rerank_operations += 1
+        self._stripe().rerank_operations += 1
     
     def record_l1_hit(self, latency: float = 0.0) -> None:
         """Record an L1 cache hit."""
-        with self._lock:
-            self.l1_hits += 1
-            if latency > 0:
-                self.l1_latencies.append(latency)
-                # Keep only last 1000 latencies to avoid memory bloat
-                if len(self.l1_latencies) > 1000:
-                    self.l1_latencies = self.l1_latencies[-1000:]
-    
-    def record_l1_miss(self) -> None:
+        stripe = self._stripe()
+        stripe.l1_hits += 1
+        stripe.l1_total += 1
+        if latency > 0:
+            with self._l1_lock:
+                self.l1_latency_hist.record(latency * 1000)
+                self._l1_recent.append(latency * 1000)
+    
+    def record_l1_hits(self, latencies: List[float]) -> None:
+        """Record several L1 cache hits at once (one latency per hit)."""
+        if not latencies:
+            return
+        stripe = self._stripe()
+        stripe.l1_hits += len(latencies)
+        stripe.l1_total += len(latencies)
+        latencies_ms = [latency * 1000 for latency in latencies if latency > 0]
+        with self._l1_lock:
+            self.l1_latency_hist.record_many(latencies_ms)
+            self._l1_recent.extend(latencies_ms)
+    
+    def record_l1_miss(self, count: int = 1) -> None:
         """Record an L1 cache miss."""
-        with self._lock:
-            self.l1_misses += 1
+        stripe = self._stripe()
+        stripe.l1_misses += count
+        stripe.l1_total += count
     
     def record_l2_hit(self, latency: float = 0.0) -> None:
         """Record an L2 cache hit."""
-        with self._lock:
-            self.l2_hits += 1
-            if latency > 0:
-                self.l2_latencies.append(latency)
-                if len(self.l2_latencies) > 1000:
-                    self.l2_latencies = self.l2_latencies[-1000:]
-    
-    def record_l2_miss(self) -> None:
+        stripe = self._stripe()
+        stripe.l2_hits += 1
+        stripe.l2_total += 1
+        if latency > 0:
+            with self._l2_lock:
+                self.l2_latency_hist.record(latency * 1000)
+                self._l2_recent.append(latency * 1000)
+    
+    def record_l2_hits(self, latencies: List[float]) -> None:
+        """Record several L2 cache hits at once (one latency per hit)."""
+        if not latencies:
+            return
+        stripe = self._stripe()
+        stripe.l2_hits += len(latencies)
+        stripe.l2_total += len(latencies)
+        latencies_ms = [latency * 1000 for latency in latencies if latency > 0]
+        with self._l2_lock:
+            self.l2_latency_hist.record_many(latencies_ms)
+            self._l2_recent.extend(latencies_ms)
+    
+    def record_l2_miss(self, count: int = 1) -> None:
         """Record an L2 cache miss."""
-        with self._lock:
-            self.l2_misses += 1
+        stripe = self._stripe()
+        stripe.l2_misses += count
+        stripe.l2_total += count
+    
+    def record_negative_cache_hit(self) -> None:
+        """Record a lookup short-circuited by the negative cache."""
+        self._stripe().negative_cache_hits += 1
     
     def record_context_hit(self, context_type: str) -> None:
         """Record a cache hit for a specific context type."""
-        with self._lock:
-            self.context_hits[context_type] += 1
+        with self._counter_lock:
+            self.context_hits.add(context_type)
+    
+    def record_context_hits(self, counts: Mapping[str, int]) -> None:
+        """Record cache hits for several context types at once."""
+        if not counts:
+            return
+        with self._counter_lock:
+            for context_type, count in counts.items():
+                self.context_hits.add(context_type, count)
     
     def record_tag_invalidation(self, tag: str, count: int = 1) -> None:
         """Record a tag invalidation."""
-        with self._lock:
-            self.tag_invalidations[tag] += count
+        with self._counter_lock:
+            self.tag_invalidations.add(tag, count)
     
     @property
     def hit_rate(self) -> float:
         """Calculate cache hit rate percentage."""
-        with self._lock:
-            if self.total_queries == 0:
-                return 0.0
-            return (self.cache_hits / self.total_queries) * 100
+        t = self._totals()
+        if t.total_queries == 0:
+            return 0.0
+        return (t.cache_hits / t.total_queries) * 100
     
     @property
     def cost_savings_percentage(self) -> float:
         """Calculate cost savings percentage."""
-        with self._lock:
-            if self.total_queries == 0:
-                return 0.0
-            return (self.llm_calls_avoided / self.total_queries) * 100
+        t = self._totals()
+        if t.total_queries == 0:
+            return 0.0
+        return (t.llm_calls_avoided / t.total_queries) * 100
+    
+    total_latency_saved = _striped_counter(
+        "latency_saved_ns", "Total latency saved by cache hits (in seconds).", scale=1e9
+    )
     
     @property
     def average_latency_saved(self) -> float:
         """Calculate average latency saved per cache hit (in milliseconds)."""
-        with self._lock:
-            if self.cache_hits == 0:
-                return 0.0
-            return (self.total_latency_saved / self.cache_hits) * 1000
+        t = self._totals()
+        if t.cache_hits == 0:
+            return 0.0
+        return t.latency_saved_ns / t.cache_hits / 1e6
     
     @property
     def stale_served_count(self) -> int:
         """Number of stale entries served."""
-        with self._lock:
+        with self._stale_lock:
             return self._stale_served_count
     
-    @property
-    def stale_refused_count(self) -> int:
-        """Number of stale entries refused (too old)."""
-        with self._lock:
-            return self._stale_refused_count
-    
-    @property
-    def version_mismatches(self) -> int:
-        """Number of version mismatches detected."""
-        with self._lock:
-            return self._version_mismatches
+    stale_refused_count = _striped_counter(
+        "stale_refused_count", "Number of stale entries refused (too old)."
+    )
+    version_mismatches = _striped_counter(
+        "version_mismatches", "Number of version mismatches detected."
+    )
     
     @property
     def average_stale_age_seconds(self) -> float:
         """Average age of stale entries served."""
-        with self._lock:
+        with self._stale_lock:
             if self._stale_served_count == 0:
                 return 0.0
             return self._total_age_seconds / self._stale_served_count
     
+    @property
+    def l1_latencies(self) -> List[float]:
+        """Recent L1 hit latencies in seconds, oldest first (deprecated).
+        
+        Use ``to_dict()["l1_cache"]`` percentiles or ``l1_latency_hist``.
+        """
+        warnings.warn(
+            "CacheMetrics.l1_latencies is deprecated; use l1_latency_hist or to_dict()",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        with self._l1_lock:
+            return (self._l1_recent.values() / 1000).tolist()
+    
+    @property
+    def l2_latencies(self) -> List[float]:
+        """Recent L2 hit latencies in seconds, oldest first (deprecated).
+        
+        Use ``to_dict()["l2_cache"]`` percentiles or ``l2_latency_hist``.
+        """
+        warnings.warn(
+            "CacheMetrics.l2_latencies is deprecated; use l2_latency_hist or to_dict()",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        with self._l2_lock:
+            return (self._l2_recent.values() / 1000).tolist()
+    
     def record_stale_served(self, age_seconds: float):
         """Record that a stale entry was served."""
-        with self._lock:
+        with self._stale_lock:
             self._stale_served_count += 1
             self._total_age_seconds += age_seconds
     
     def record_stale_refused(self):
         """Record that a stale entry was refused."""
-        with self._lock:
-            self._stale_refused_count += 1
+        self._stripe().stale_refused_count += 1
     
     def record_version_mismatch(self):
         """Record a version mismatch."""
-        with self._lock:
-            self._version_mismatches += 1
+        self._stripe().version_mismatches += 1
+    
+    def record_refresh_dropped(self):
+        """Record a background refresh dropped because the queue was full."""
+        self._stripe().refresh_dropped_count += 1
     
     @property
     def error_rate(self) -> float:
         """Calculate error rate percentage."""
-        with self._lock:
-            if self.total_queries == 0:
-                return 0.0
-            return (self.errors / self.total_queries) * 100
+        total_queries = self.total_queries
+        if total_queries == 0:
+            return 0.0
+        return (self.errors / total_queries) * 100
+    
+    def _snapshot(self) -> _MetricsSnapshot:
+        """Copy the current metrics.
+        
+        Only the copy happens under the locks; exporters format the
+        snapshot afterwards so recorders are not blocked while text is
+        built. Each partition is copied under its own lock.
+        """
+        totals = self._totals()
+        with self._l1_lock:
+            l1_latency_hist = self.l1_latency_hist.copy()
+            l1_recent_latency_ms = self._l1_recent.mean()
+        with self._l2_lock:
+            l2_latency_hist = self.l2_latency_hist.copy()
+            l2_recent_latency_ms = self._l2_recent.mean()
+        with self._counter_lock:
+            context_hits = self.context_hits.view()
+            tag_invalidations = self.tag_invalidations.view()
+        with self._stale_lock:
+            stale_served_count = self._stale_served_count
+            total_age_seconds = self._total_age_seconds
+        return _MetricsSnapshot(
+            totals=totals,
+            errors=totals.errors,
+            rerank_operations=totals.rerank_operations,
+            negative_cache_hits=totals.negative_cache_hits,
+            stale_served_count=stale_served_count,
+            stale_refused_count=totals.stale_refused_count,
+            version_mismatches=totals.version_mismatches,
+            total_age_seconds=total_age_seconds,
+            refresh_dropped_count=totals.refresh_dropped_count,
+            context_hits=context_hits,
+            tag_invalidations=tag_invalidations,
+            l1_latency_hist=l1_latency_hist,
+            l2_latency_hist=l2_latency_hist,
+            l1_recent_latency_ms=l1_recent_latency_ms,
+            l2_recent_latency_ms=l2_recent_latency_ms,
+        )
     
     def to_dict(self) -> Dict[str, Any]:
         """Export metrics as dictionary."""
-        with self._lock:
-            # Calculate all metrics inline to avoid any potential issues
-            hit_rate = (self.cache_hits / self.total_queries * 100) if self.total_queries > 0 else 0.0
-            cost_savings = (self.llm_calls_avoided / self.total_queries * 100) if self.total_queries > 0 else 0.0
-            avg_latency = (self.total_latency_saved / self.cache_hits * 1000) if self.cache_hits > 0 else 0.0
-            error_rate = (self.errors / self.total_queries * 100) if self.total_queries > 0 else 0.0
-            
-            l1_total = self.l1_hits + self.l1_misses
-            l2_total = self.l2_hits + self.l2_misses
-            
-            l1_hit_rate = (self.l1_hits / l1_total * 100) if l1_total > 0 else 0.0
-            l2_hit_rate = (self.l2_hits / l2_total * 100) if l2_total > 0 else 0.0
-            
-            l1_avg_latency = (sum(self.l1_latencies) / len(self.l1_latencies) * 1000) if self.l1_latencies else 0.0
-            l2_avg_latency = (sum(self.l2_latencies) / len(self.l2_latencies) * 1000) if self.l2_latencies else 0.0
-            
-            avg_stale_age = (self._total_age_seconds / self._stale_served_count) if self._stale_served_count > 0 else 0.0
-            
-            return {
-                "total_queries": self.total_queries,
-                "cache_hits": self.cache_hits,
-                "cache_misses": self.cache_misses,
-                "hit_rate_percentage": round(hit_rate, 2),
-                "cost_savings_percentage": round(cost_savings, 2),
-                "llm_calls_avoided": self.llm_calls_avoided,
-                "avg_latency_saved_ms": round(avg_latency, 2),
-                "errors": self.errors,
-                "error_rate_percentage": round(error_rate, 2),
-                "rerank_operations": self.rerank_operations,
-                "l1_cache": {
-                    "hits": self.l1_hits,
-                    "misses": self.l1_misses,
-                    "hit_rate_percentage": round(l1_hit_rate, 2),
-                    "avg_latency_ms": round(l1_avg_latency, 3),
-                },
-                "l2_cache": {
-                    "hits": self.l2_hits,
-                    "misses": self.l2_misses,
-                    "hit_rate_percentage": round(l2_hit_rate, 2),
-                    "avg_latency_ms": round(l2_avg_latency, 3),
-                },
-                "context_hits": dict(self.context_hits),
-                "tag_invalidations": dict(self.tag_invalidations),
-                "staleness": {
-                    "stale_served_count": self._stale_served_count,
-                    "stale_refused_count": self._stale_refused_count,
-                    "version_mismatches": self._version_mismatches,
-                    "average_stale_age_seconds": round(avg_stale_age, 2),
-                },
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
+        # Copy under the lock, format without it
+        snap = self._snapshot()
+        t = snap.totals
+        # Calculate all metrics inline to avoid any potential issues
+        hit_rate = (t.cache_hits / t.total_queries * 100) if t.total_queries > 0 else 0.0
+        cost_savings = (t.llm_calls_avoided / t.total_queries * 100) if t.total_queries > 0 else 0.0
+        avg_latency = (t.latency_saved_ns / t.cache_hits / 1e6) if t.cache_hits > 0 else 0.0
+        error_rate = (snap.errors / t.total_queries * 100) if t.total_queries > 0 else 0.0
+        
+        l1_hit_rate = (t.l1_hits / t.l1_total * 100) if t.l1_total else 0.0
+        l2_hit_rate = (t.l2_hits / t.l2_total * 100) if t.l2_total else 0.0
+        
+        l1_hist = snap.l1_latency_hist
+        l2_hist = snap.l2_latency_hist
+        
+        avg_stale_age = (snap.total_age_seconds / snap.stale_served_count) if snap.stale_served_count > 0 else 0.0
+        
+        return {
+            "total_queries": t.total_queries,
+            "cache_hits": t.cache_hits,
+            "cache_misses": t.cache_misses,
+            "hit_rate_percentage": round(hit_rate, 2),
+            "cost_savings_percentage": round(cost_savings, 2),
+            "llm_calls_avoided": t.llm_calls_avoided,
+            "avg_latency_saved_ms": round(avg_latency, 2),
+            "errors": snap.errors,
+            "error_rate_percentage": round(error_rate, 2),
+            "rerank_operations": snap.rerank_operations,
+            "l1_cache": {
+                "hits": t.l1_hits,
+                "misses": t.l1_misses,
+                "hit_rate_percentage": round(l1_hit_rate, 2),
+                "avg_latency_ms": round(l1_hist.mean(), 3),
+                "recent_avg_latency_ms": round(snap.l1_recent_latency_ms, 3),
+                "p50_latency_ms": round(l1_hist.quantile(0.50), 3),
+                "p95_latency_ms": round(l1_hist.quantile(0.95), 3),
+                "p99_latency_ms": round(l1_hist.quantile(0.99), 3),
+            },
+            "l2_cache": {
+                "hits": t.l2_hits,
+                "misses": t.l2_misses,
+                "hit_rate_percentage": round(l2_hit_rate, 2),
+                "avg_latency_ms": round(l2_hist.mean(), 3),
+                "recent_avg_latency_ms": round(snap.l2_recent_latency_ms, 3),
+                "p50_latency_ms": round(l2_hist.quantile(0.50), 3),
+                "p95_latency_ms": round(l2_hist.quantile(0.95), 3),
+                "p99_latency_ms": round(l2_hist.quantile(0.99), 3),
+            },
+            "negative_cache_hits": snap.negative_cache_hits,
+            "context_hits": dict(snap.context_hits),
+            "tag_invalidations": dict(snap.tag_invalidations),
+            "staleness": {
+                "stale_served_count": snap.stale_served_count,
+                "stale_refused_count": snap.stale_refused_count,
+                "version_mismatches": snap.version_mismatches,
+                "average_stale_age_seconds": round(avg_stale_age, 2),
+                "refresh_dropped_count": snap.refresh_dropped_count,
+            },
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
     
     def to_prometheus(self) -> str:
-        """Export metrics in Prometheus format with L1/L2 breakdown."""
-        with self._lock:
-            hit_rate = (self.cache_hits / self.total_queries * 100) if self.total_queries > 0 else 0.0
-            l1_hit_rate = (self.l1_hits / (self.l1_hits + self.l1_misses) * 100) if (self.l1_hits + self.l1_misses) > 0 else 0.0
-            l2_hit_rate = (self.l2_hits / (self.l2_hits + self.l2_misses) * 100) if (self.l2_hits + self.l2_misses) > 0 else 0.0
-            l1_avg_latency = (sum(self.l1_latencies) / len(self.l1_latencies) * 1000) if self.l1_latencies else 0.0
-            l2_avg_latency = (sum(self.l2_latencies) / len(self.l2_latencies) * 1000) if self.l2_latencies else 0.0
-            
-            metrics = [
-                # Overall metrics
-                f"# HELP semantic_cache_queries_total Total number of cache queries",
-                f"# TYPE semantic_cache_queries_total counter",
-                f"semantic_cache_queries_total {self.total_queries}",
-                "",
-                f"# HELP semantic_cache_hits_total Total number of cache hits",
-                f"# TYPE semantic_cache_hits_total counter",
-                f"semantic_cache_hits_total {self.cache_hits}",
-                "",
-                f"# HELP semantic_cache_misses_total Total number of cache misses",
-                f"# TYPE semantic_cache_misses_total counter",
-                f"semantic_cache_misses_total {self.cache_misses}",
-                "",
-                f"# HELP semantic_cache_hit_rate Cache hit rate percentage",
-                f"# TYPE semantic_cache_hit_rate gauge",
-                f"semantic_cache_hit_rate {hit_rate}",
-                "",
-                
-                # L1 metrics
-                f"# HELP semantic_cache_l1_hits_total Total L1 cache hits",
-                f"# TYPE semantic_cache_l1_hits_total counter",
-                f"semantic_cache_l1_hits_total {self.l1_hits}",
-                "",
-                f"# HELP semantic_cache_l1_misses_total Total L1 cache misses",
-                f"# TYPE semantic_cache_l1_misses_total counter",
-                f"semantic_cache_l1_misses_total {self.l1_misses}",
-                "",
-                f"# HELP semantic_cache_l1_hit_rate L1 cache hit rate percentage",
-                f"# TYPE semantic_cache_l1_hit_rate gauge",
-                f"semantic_cache_l1_hit_rate {l1_hit_rate}",
-                "",
-                f"# HELP semantic_cache_l1_latency_ms Average L1 latency in milliseconds",
-                f"# TYPE semantic_cache_l1_latency_ms gauge",
-                f"semantic_cache_l1_latency_ms {l1_avg_latency}",
-                "",
-                
-                # L2 metrics
-                f"# HELP semantic_cache_l2_hits_total Total L2 cache hits",
-                f"# TYPE semantic_cache_l2_hits_total counter",
-                f"semantic_cache_l2_hits_total {self.l2_hits}",
-                "",
-                f"# HELP semantic_cache_l2_misses_total Total L2 cache misses",
-                f"# TYPE semantic_cache_l2_misses_total counter",
-                f"semantic_cache_l2_misses_total {self.l2_misses}",
-                "",
-                f"# HELP semantic_cache_l2_hit_rate L2 cache hit rate percentage",
-                f"# TYPE semantic_cache_l2_hit_rate gauge",
-                f"semantic_cache_l2_hit_rate {l2_hit_rate}",
-                "",
-                f"# HELP semantic_cache_l2_latency_ms Average L2 latency in milliseconds",
-                f"# TYPE semantic_cache_l2_latency_ms gauge",
-                f"semantic_cache_l2_latency_ms {l2_avg_latency}",
-                "",
-                
-                # Other metrics
-                f"# HELP semantic_cache_llm_calls_avoided Total LLM calls avoided",
-                f"# TYPE semantic_cache_llm_calls_avoided counter",
-                f"semantic_cache_llm_calls_avoided {self.llm_calls_avoided}",
-                "",
-                f"# HELP semantic_cache_errors_total Total number of errors",
-                f"# TYPE semantic_cache_errors_total counter",
-                f"semantic_cache_errors_total {self.errors}",
-                "",
-                f"# HELP semantic_cache_rerank_operations_total Total rerank operations",
-                f"# TYPE semantic_cache_rerank_operations_total counter",
-                f"semantic_cache_rerank_operations_total {self.rerank_operations}",
-                "",
-            ]
-            
-            # Add context metrics
-            if self.context_hits:
-                metrics.extend([
-                    f"# HELP semantic_cache_context_hits_total Cache hits by context type",
-                    f"# TYPE semantic_cache_context_hits_total counter",
-                ])
-                for context_type, count in self.context_hits.items():
-                    metrics.append(f'semantic_cache_context_hits_total{{context_type="{context_type}"}} {count}')
-                metrics.append("")
-            
-            # Add tag metrics
-            if self.tag_invalidations:
-                metrics.extend([
-                    f"# HELP semantic_cache_tag_invalidations_total Tag invalidations",
-                    f"# TYPE semantic_cache_tag_invalidations_total counter",
-                ])
-                for tag, count in self.tag_invalidations.items():
-                    metrics.append(f'semantic_cache_tag_invalidations_total{{tag="{tag}"}} {count}')
-                metrics.append("")
-            
-            return "\n".join(metrics)
+        """Export metrics in Prometheus format with L1/L2 breakdown.
+        
+        When ``prometheus_cache_seconds`` is set, the rendered text is
+        reused for that long so overlapping scrapes share one render; by
+        default every call renders fresh values.
+        """
+        ttl = self.prometheus_cache_seconds
+        now = time.monotonic()
+        cached = self._prom_cached
+        if cached is not None and now - cached[0] < ttl:
+            return cached[2]
+        data = b"".join(self._prometheus_chunks())
+        # Drop the final newline so output ends like the previous line-joined text
+        body = data[:-1].decode()
+        if ttl > 0:
+            self._prom_cached = (now, data, body)
+        return body
+    
+    async def iter_prometheus(self) -> AsyncIterator[bytes]:
+        """Stream metrics in Prometheus format as UTF-8 chunks.
+        
+        Suited to streaming HTTP responses: label lines are yielded one at
+        a time instead of being joined into a single string, and control
+        returns to the event loop between chunks so large context/tag
+        label sets don't stall other tasks. A cached export from
+        ``to_prometheus`` is reused while fresh.
+        """
+        ttl = self.prometheus_cache_seconds
+        now = time.monotonic()
+        cached = self._prom_cached
+        if cached is not None and now - cached[0] < ttl:
+            yield cached[1]
+            return
+        chunks = []
+        for chunk in self._prometheus_chunks():
+            chunks.append(chunk)
+            yield chunk
+            await asyncio.sleep(0)
+        if ttl > 0:
+            data = b"".join(chunks)
+            self._prom_cached = (now, data, data[:-1].decode())
+    
+    def _prometheus_chunks(self) -> Iterator[bytes]:
+        """Render metrics as Prometheus text, section by section."""
+        # Copy under the lock, format without it
+        snap = self._snapshot()
+        t = snap.totals
+        hit_rate = (t.cache_hits / t.total_queries * 100) if t.total_queries > 0 else 0.0
+        l1_hit_rate = (t.l1_hits / t.l1_total * 100) if t.l1_total else 0.0
+        l2_hit_rate = (t.l2_hits / t.l2_total * 100) if t.l2_total else 0.0
+        
+        l1_hist = snap.l1_latency_hist
+        l2_hist = snap.l2_latency_hist
+        
+        # Values in _PROM_TEMPLATE order
+        values = (
+            t.total_queries,
+            t.cache_hits,
+            t.cache_misses,
+            hit_rate,
+            t.l1_hits,
+            t.l1_misses,
+            l1_hit_rate,
+            l1_hist.mean(),
+            t.l2_hits,
+            t.l2_misses,
+            l2_hit_rate,
+            l2_hist.mean(),
+            snap.negative_cache_hits,
+            t.llm_calls_avoided,
+            snap.errors,
+            snap.rerank_operations,
+            *l1_hist.cumulative_counts(_LATENCY_BUCKETS_MS),
+            l1_hist.count,
+            l1_hist.total,
+            l1_hist.count,
+            *l2_hist.cumulative_counts(_LATENCY_BUCKETS_MS),
+            l2_hist.count,
+            l2_hist.total,
+            l2_hist.count,
+        )
+        
+        yield _PROM_TEMPLATE % values
+        
+        # Add context metrics
+        if snap.context_hits:
+            yield _PROM_CONTEXT_HEADER
+            for context_type, count in snap.context_hits.items():
+                yield b'semantic_cache_context_hits_total{context_type="%s"} %d\n' % (context_type.encode(), count)
+            yield b"\n"
+        
+        # Add tag metrics
+        if snap.tag_invalidations:
+            yield _PROM_TAG_HEADER
+            for tag, count in snap.tag_invalidations.items():
+                yield b'semantic_cache_tag_invalidations_total{tag="%s"} %d\n' % (tag.encode(), count)
+            yield b"\n"
 
     def reset(self) -> None:
         """Reset all metrics to zero."""
-        with self._lock:
-            self.total_queries = 0
-            self.cache_hits = 0
-            self.cache_misses = 0
-            self.total_latency_saved = 0.0
-            self.llm_calls_avoided = 0
-            self.errors = 0
-            self.rerank_operations = 0
-            self.l1_hits = 0
-            self.l1_misses = 0
-            self.l2_hits = 0
-            self.l2_misses = 0
+        with self._l1_lock, self._l2_lock, self._counter_lock, self._stale_lock:
+            # Stripes are zeroed in place; threads keep their stripe references
+            for stripe in self._stripes:
+                stripe.reset()
             self._stale_served_count = 0
-            self._stale_refused_count = 0
-            self._version_mismatches = 0
             self._total_age_seconds = 0.0
             self.context_hits.clear()
             self.tag_invalidations.clear()
-            self.l1_latencies.clear()
-            self.l2_latencies.clear()
+            self.l1_latency_hist.reset()
+            self.l2_latency_hist.reset()
+            self._l1_recent.reset()
+            self._l2_recent.reset()
+            self._prom_cached = None
@@ -0,0 +1,65 @@
+from typing import Hashable, Set
+import threading
+import time
+from vertector_semantic_cache.utils.logging import get_logger
+
+logger = get_logger("core.negative_cache")
+
+class NegativeCache:
+    """In-memory set of keys that recently missed L2.
+
+    Keys are kept as their hash in two generations. A generation is rotated
+    every ttl_seconds (or early once it holds half the capacity), so a miss
+    is remembered for between one and two TTLs and memory stays bounded.
+    Keys sharing a hash share an entry, so a collision can (rarely) report
+    a miss for a key that never missed.
+    """
+
+    def __init__(self, capacity: int = 10000, ttl_seconds: int = 60):
+        self._lock = threading.Lock()
+        self._generation_size = max(1, capacity // 2)
+        self._ttl = ttl_seconds
+        self._current: Set[int] = set()
+        self._previous: Set[int] = set()
+        self._rotated_at = time.monotonic()
+
+        logger.info(f"Initialized negative cache (capacity={capacity}, ttl={ttl_seconds}s)")
+
+    def _rotate_if_needed(self) -> None:
+        """Start a new generation when the current one is full or expired.
+
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        elapsed = now - self._rotated_at
+        if elapsed >= self._ttl or len(self._current) >= self._generation_size:
+            # Both generations are expired after two TTLs without traffic
+            self._previous = self._current if elapsed < 2 * self._ttl else set()
+            self._current = set()
+            self._rotated_at = now
+
+    def contains(self, key: Hashable) -> bool:
+        """Check whether key recently missed L2."""
+        h = hash(key)
+        with self._lock:
+            self._rotate_if_needed()
+            return h in self._current or h in self._previous
+
+    def add(self, key: Hashable) -> None:
+        """Record an L2 miss for key."""
+        h = hash(key)
+        with self._lock:
+            self._rotate_if_needed()
+            self._current.add(h)
+
+    def clear(self) -> None:
+        """Forget all recorded misses."""
+        with self._lock:
+            self._current = set()
+            self._previous = set()
+            self._rotated_at = time.monotonic()
+
+    def __len__(self) -> int:
+        """Get number of remembered misses."""
+        with self._lock:
+            return len(self._current) + len(self._previous)
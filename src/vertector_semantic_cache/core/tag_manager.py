@@ -1,78 +1,115 @@
-from typing import List, Optional
+from typing import List, Optional, Union
+import uuid
 from vertector_semantic_cache.utils.logging import get_logger
 
 logger = get_logger("core.tag_manager")
 
+# Keys removed per UNLINK call inside Lua (bounded by Lua's unpack limit)
+_UNLINK_CHUNK = 1000
+
+# Larger sets skip the script: SMEMBERS inside Lua blocks Redis for
+# O(set size), so they are streamed with SSCAN and UNLINKed in batches
+_LUA_MAX_MEMBERS = 10000
+
+# Keys fetched per SSCAN call and removed per UNLINK call on the large-set path
+_BATCH_SIZE = 512
+
+# Delete every member of the set KEYS[1], then the set itself.
+# Returns the number of cache entries removed, or -1 without touching
+# anything if the set has more than ARGV[2] members.
+# The members are not declared in KEYS, so this is not Redis Cluster safe.
+_INVALIDATE_TAG_LUA = """
+if redis.call('SCARD', KEYS[1]) > tonumber(ARGV[2]) then
+    return -1
+end
+local members = redis.call('SMEMBERS', KEYS[1])
+local chunk = tonumber(ARGV[1])
+local deleted = 0
+for i = 1, #members, chunk do
+    deleted = deleted + redis.call('UNLINK', unpack(members, i, math.min(i + chunk - 1, #members)))
+end
+redis.call('UNLINK', KEYS[1])
+return deleted
+"""
+
 class TagManager:
-    """Manage tag-based cache invalidation."""
+    """Manage tag-based cache invalidation.
+    
+    Tag sets of up to _LUA_MAX_MEMBERS keys are resolved and deleted
+    server-side by a script; larger ones are streamed with SSCAN so no
+    single call blocks Redis for the whole set.
+    """
     
     def __init__(self, redis_client):
         self.redis = redis_client
+        self._invalidate_script = redis_client.register_script(_INVALIDATE_TAG_LUA)
     
-    async def add_tags(self, cache_key: str, tags: List[str]) -> None:
-        """Associate tags with a cache key."""
-        if not tags:
+    async def add_tags(self, cache_key: Union[str, List[str]], tags: List[str]) -> None:
+        """Associate tags with one or more cache keys.
+        
+        Args:
+            cache_key: Cache key, or a list of keys sharing the same tags
+            tags: Tags to add
+        """
+        cache_keys = [cache_key] if isinstance(cache_key, str) else cache_key
+        if not tags or not cache_keys:
             return
-            
-        pipeline = self.redis.pipeline()
+        
+        if len(tags) == 1:
+            # A single command needs no pipeline
+            await self.redis.sadd(f"tag:{tags[0]}", *cache_keys)
+            logger.debug(f"Added tags {tags} to keys {cache_keys}")
+            return
+        
+        # One multi-member SADD per tag
+        pipeline = self.redis.pipeline(transaction=False)
         for tag in tags:
-            pipeline.sadd(f"tag:{tag}", cache_key)
+            pipeline.sadd(f"tag:{tag}", *cache_keys)
         await pipeline.execute()
-        logger.debug(f"Added tags {tags} to key {cache_key}")
+        logger.debug(f"Added tags {tags} to keys {cache_keys}")
     
     async def invalidate_by_tag(self, tag: str) -> int:
         """Invalidate all cache entries with this tag."""
-        tag_key = f"tag:{tag}"
-        cache_keys = await self.redis.smembers(tag_key)
-        
-        if not cache_keys:
-            return 0
-            
-        # Convert bytes to strings if needed
-        cache_keys = [k.decode('utf-8') if isinstance(k, bytes) else k for k in cache_keys]
-        
-        # Delete all cache entries
         # Note: This deletes the main hash key. RedisVL index might need separate cleanup
         # if it stores vectors separately, but usually it's all in the hash.
         # However, RedisVL uses a specific prefix. We assume cache_key is the full key.
+        deleted = await self._invalidate_set(f"tag:{tag}")
         
-        pipeline = self.redis.pipeline()
-        if cache_keys:
-            pipeline.delete(*cache_keys)
-        
-        # Delete tag mapping
-        pipeline.delete(tag_key)
-        
-        await pipeline.execute()
-        logger.info(f"Invalidated {len(cache_keys)} entries for tag '{tag}'")
-        return len(cache_keys)
+        logger.info(f"Invalidated {deleted} entries for tag '{tag}'")
+        return deleted
     
     async def invalidate_by_tags(
         self,
         tags: List[str],
         match_all: bool = False
     ) -> int:
-        """Invalidate by multiple tags."""
+        """Invalidate by multiple tags.
+        
+        The union (or intersection) is stored in a temporary set on the
+        server and deleted the same way as in ``invalidate_by_tag``.
+        """
         if not tags:
             return 0
             
         tag_keys = [f"tag:{tag}" for tag in tags]
+        tmp_key = f"tag:__tmp:{uuid.uuid4().hex}"
         
-        if match_all:
-            # Intersection: entries with ALL tags
-            cache_keys = await self.redis.sinter(tag_keys)
-        else:
-            # Union: entries with ANY tag
-            cache_keys = await self.redis.sunion(tag_keys)
+        try:
+            if match_all:
+                # Intersection: entries with ALL tags
+                stored = await self.redis.sinterstore(tmp_key, tag_keys)
+            else:
+                # Union: entries with ANY tag
+                stored = await self.redis.sunionstore(tmp_key, tag_keys)
+                
+            if not stored:
+                return 0
             
-        if not cache_keys:
-            return 0
-            
-        cache_keys = [k.decode('utf-8') if isinstance(k, bytes) else k for k in cache_keys]
-        
-        pipeline = self.redis.pipeline()
-        if cache_keys:
-            pipeline.delete(*cache_keys)
+            # Deletes the entries and the temporary set
+            deleted = await self._invalidate_set(tmp_key)
+        finally:
+            # Already removed on success; this covers failures
+            await self.redis.unlink(tmp_key)
             
         # We should also clean up the tag sets, but that's harder for intersection/union
         # because we don't know which keys belong to which tag without checking.
@@ -83,6 +120,33 @@ class TagManager:
         # This is fine, but eventually we want to clean up tag sets.
         # For simplicity in this iteration, we just delete the entries.
         
-        await pipeline.execute()
-        logger.info(f"Invalidated {len(cache_keys)} entries for tags {tags}")
-        return len(cache_keys)
+        logger.info(f"Invalidated {deleted} entries for tags {tags}")
+        return deleted
+    
+    async def _invalidate_set(self, set_key: str) -> int:
+        """Delete every member of set_key, then the set itself.
+        
+        Small sets take one round trip through the script, which reports
+        -1 for sets above _LUA_MAX_MEMBERS; those are streamed with SSCAN
+        and UNLINKed in batches instead.
+        
+        Returns:
+            Number of cache entries removed
+        """
+        deleted = await self._invalidate_script(
+            keys=[set_key], args=[_UNLINK_CHUNK, _LUA_MAX_MEMBERS]
+        )
+        if deleted >= 0:
+            return deleted
+        
+        deleted = 0
+        batch: List = []
+        async for cache_key in self.redis.sscan_iter(set_key, count=_BATCH_SIZE):
+            batch.append(cache_key)
+            if len(batch) >= _BATCH_SIZE:
+                deleted += await self.redis.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await self.redis.unlink(*batch)
+        await self.redis.unlink(set_key)
+        return deleted
@@ -10,8 +10,12 @@ to stderr, never stdout. This is configured at the top of this module.
 import os
 import sys
 import asyncio
+import functools
+import hashlib
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+
+import orjson
 
 # CRITICAL: Redirect ALL logging to stderr before importing anything else
 # MCP uses stdout for JSON-RPC, so any stdout output corrupts the protocol
@@ -57,9 +61,185 @@ logger.setLevel(logging.INFO)
 # Global cache manager instance
 _cache_manager: Optional[AsyncSemanticCacheManager] = None
 
+# Context key holding the digest of a prompt's shared prefix
+PROMPT_PREFIX_FIELD = "prompt_prefix"
+
+
+# Tool input schemas, built once at import and shared by every server.
+# Nothing mutates them.
+_CACHE_CHECK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "prompt": {
+            "type": "string",
+            "description": "The prompt to check"
+        },
+        "user_id": {
+            "type": "string",
+            "description": "Optional user ID for multi-tenancy"
+        },
+        "context": {
+            "type": "object",
+            "description": "Optional context for context-aware caching"
+        },
+        "static_prefix": {
+            "type": "string",
+            "description": "Optional shared prefix (e.g. system prompt); only the rest is matched semantically"
+        }
+    },
+    "required": ["prompt"]
+}
+
+_CACHE_STORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "prompt": {
+            "type": "string",
+            "description": "The prompt"
+        },
+        "response": {
+            "type": "string",
+            "description": "The response to cache"
+        },
+        "user_id": {
+            "type": "string",
+            "description": "Optional user ID"
+        },
+        "tags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional tags for invalidation"
+        },
+        "context": {
+            "type": "object",
+            "description": "Optional context"
+        },
+        "static_prefix": {
+            "type": "string",
+            "description": "Optional shared prefix (e.g. system prompt); only the rest is matched semantically"
+        }
+    },
+    "required": ["prompt", "response"]
+}
+
+_CACHE_CLEAR_SCHEMA = {
+    "type": "object",
+    "properties": {}
+}
+
+_INVALIDATE_BY_TAG_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tag": {
+            "type": "string",
+            "description": "Tag to invalidate"
+        }
+    },
+    "required": ["tag"]
+}
+
+_INVALIDATE_BY_TAGS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Tags to invalidate"
+        },
+        "match_all": {
+            "type": "boolean",
+            "description": "If true, only invalidate entries with ALL tags"
+        }
+    },
+    "required": ["tags"]
+}
 
+_BATCH_CHECK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "prompts": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "List of prompts to check"
+        },
+        "user_id": {
+            "type": "string",
+            "description": "Optional user ID applied to every prompt"
+        }
+    },
+    "required": ["prompts"]
+}
+
+
+def _to_json(obj: Any) -> str:
+    """Serialize a resource payload as indented JSON."""
+    return orjson.dumps(
+        obj,
+        default=str,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    ).decode()
+
+
+def split_prefix(
+    prompt: str,
+    static_prefix: Optional[str] = None,
+    boundary: Optional[str] = None,
+) -> Tuple[str, str]:
+    """
+    Split a prompt into (static prefix, dynamic suffix).
+    
+    Args:
+        prompt: Full prompt
+        static_prefix: Known shared prefix; used when the prompt starts with it
+        boundary: Marker starting the dynamic part; the split is at its last occurrence
+        
+    Returns:
+        Tuple of (prefix, suffix); prefix is empty when no split applies
+    """
+    if static_prefix and prompt.startswith(static_prefix):
+        return static_prefix, prompt[len(static_prefix):]
+    if boundary:
+        idx = prompt.rfind(boundary)
+        if idx > 0:
+            return prompt[:idx], prompt[idx:]
+    return "", prompt
+
+
+def _split_prompt_arguments(arguments: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Get the prompt to match and the context for a cache_check/cache_store call.
+    
+    A shared prefix is removed from the prompt, so only the dynamic part
+    is embedded and matched, and its digest is added to the context so
+    entries under different prefixes stay separate.
+    """
+    context = arguments.get("context")
+    prefix, suffix = split_prefix(
+        arguments["prompt"],
+        static_prefix=arguments.get("static_prefix"),
+        boundary=os.environ.get("PROMPT_PREFIX_BOUNDARY"),
+    )
+    if not prefix or not suffix.strip():
+        return arguments["prompt"], context
+    
+    prefix_digest = hashlib.sha256(prefix.encode()).hexdigest()
+    return suffix, {**(context or {}), PROMPT_PREFIX_FIELD: prefix_digest}
+
+
+def _read_warm_prompts(path: Optional[str]) -> List[str]:
+    """Read warm-up prompts from a file, one per line."""
+    if not path:
+        return []
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f if line.strip()]
+    except OSError as e:
+        logger.warning("Could not read warm prompts from %s: %s", path, e)
+        return []
+
+
+@functools.lru_cache(maxsize=1)
 def get_config_from_env() -> CacheConfig:
-    """Create CacheConfig from environment variables."""
+    """Create CacheConfig from environment variables (parsed once)."""
     return CacheConfig(
         redis_url=os.environ.get("REDIS_URL", "redis://localhost:6380"),
         name=os.environ.get("CACHE_NAME", "mcp_cache"),
@@ -71,6 +251,9 @@ def get_config_from_env() -> CacheConfig:
             provider="huggingface",
             model="sentence-transformers/all-MiniLM-L6-v2"
         ),
+        # The prompt prefix digest must also separate L1 entries
+        context_fields=["conversation_id", "user_persona", "session_id", PROMPT_PREFIX_FIELD],
+        warm_prompts=_read_warm_prompts(os.environ.get("WARM_PROMPTS_FILE")),
     )
 
 
@@ -80,8 +263,10 @@ async def get_cache_manager() -> AsyncSemanticCacheManager:
     
     if _cache_manager is None:
         config = get_config_from_env()
-        _cache_manager = AsyncSemanticCacheManager(config)
-        await _cache_manager.initialize()
+        # Only publish the manager once it initialized, so a failure is retried
+        manager = AsyncSemanticCacheManager(config)
+        await manager.initialize()
+        _cache_manager = manager
         logger.info("Cache manager initialized")
     
     return _cache_manager
@@ -91,10 +276,14 @@ async def shutdown_cache_manager():
     """Shutdown the global cache manager."""
     global _cache_manager
     
-    if _cache_manager is not None:
-        await _cache_manager.close()
-        _cache_manager = None
-        logger.info("Cache manager shut down")
+    try:
+        if _cache_manager is not None:
+            await _cache_manager.disconnect()
+            _cache_manager = None
+            logger.info("Cache manager shut down")
+    finally:
+        # Re-read the environment on the next start
+        get_config_from_env.cache_clear()
 
 
 def create_server() -> "Server":
@@ -111,120 +300,49 @@ def create_server() -> "Server":
     # TOOLS
     # =========================================================================
     
+    # Built once; the list is identical for every request
+    tools = [
+        Tool(
+            name="cache_check",
+            description="Check if a semantically similar prompt exists in cache",
+            inputSchema=_CACHE_CHECK_SCHEMA,
+        ),
+        Tool(
+            name="cache_store",
+            description="Store a prompt-response pair in the cache",
+            inputSchema=_CACHE_STORE_SCHEMA,
+        ),
+        Tool(
+            name="cache_clear",
+            description="Clear all entries from the cache",
+            inputSchema=_CACHE_CLEAR_SCHEMA,
+        ),
+        Tool(
+            name="invalidate_by_tag",
+            description="Invalidate cache entries by tag",
+            inputSchema=_INVALIDATE_BY_TAG_SCHEMA,
+        ),
+        Tool(
+            name="invalidate_by_tags",
+            description="Invalidate cache entries by multiple tags",
+            inputSchema=_INVALIDATE_BY_TAGS_SCHEMA,
+        ),
+        Tool(
+            name="batch_check",
+            description="Check multiple prompts at once",
+            inputSchema=_BATCH_CHECK_SCHEMA,
+        ),
+    ]
+    
     @server.list_tools()
     async def list_tools() -> List[Tool]:
         """List available cache tools."""
-        return [
-            Tool(
-                name="cache_check",
-                description="Check if a semantically similar prompt exists in cache",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "prompt": {
-                            "type": "string",
-                            "description": "The prompt to check"
-                        },
-                        "user_id": {
-                            "type": "string",
-                            "description": "Optional user ID for multi-tenancy"
-                        },
-                        "context": {
-                            "type": "object",
-                            "description": "Optional context for context-aware caching"
-                        }
-                    },
-                    "required": ["prompt"]
-                }
-            ),
-            Tool(
-                name="cache_store",
-                description="Store a prompt-response pair in the cache",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "prompt": {
-                            "type": "string",
-                            "description": "The prompt"
-                        },
-                        "response": {
-                            "type": "string",
-                            "description": "The response to cache"
-                        },
-                        "user_id": {
-                            "type": "string",
-                            "description": "Optional user ID"
-                        },
-                        "tags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional tags for invalidation"
-                        },
-                        "context": {
-                            "type": "object",
-                            "description": "Optional context"
-                        }
-                    },
-                    "required": ["prompt", "response"]
-                }
-            ),
-            Tool(
-                name="cache_clear",
-                description="Clear all entries from the cache",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-            Tool(
-                name="invalidate_by_tag",
-                description="Invalidate cache entries by tag",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "tag": {
-                            "type": "string",
-                            "description": "Tag to invalidate"
-                        }
-                    },
-                    "required": ["tag"]
-                }
-            ),
-            Tool(
-                name="invalidate_by_tags",
-                description="Invalidate cache entries by multiple tags",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "tags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Tags to invalidate"
-                        },
-                        "match_all": {
-                            "type": "boolean",
-                            "description": "If true, only invalidate entries with ALL tags"
-                        }
-                    },
-                    "required": ["tags"]
-                }
-            ),
-            Tool(
-                name="batch_check",
-                description="Check multiple prompts at once",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "prompts": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "List of prompts to check"
-                        }
-                    },
-                    "required": ["prompts"]
-                }
-            ),
-        ]
+        return tools
+    
+    # Fixed replies, shared by every call; the SDK copies the list into its result
+    miss_reply = [TextContent(type="text", text="Cache MISS: No matching entry found")]
+    stored_reply = [TextContent(type="text", text="Successfully stored in cache")]
+    cleared_reply = [TextContent(type="text", text="Cache cleared")]
     
     @server.call_tool()
     async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
@@ -233,29 +351,31 @@ def create_server() -> "Server":
         
         try:
             if name == "cache_check":
+                prompt, context = _split_prompt_arguments(arguments)
                 result = await cache.check(
-                    prompt=arguments["prompt"],
+                    prompt=prompt,
                     user_id=arguments.get("user_id"),
-                    context=arguments.get("context"),
+                    context=context,
                 )
                 if result:
                     return [TextContent(type="text", text=f"Cache HIT: {result}")]
                 else:
-                    return [TextContent(type="text", text="Cache MISS: No matching entry found")]
+                    return miss_reply
             
             elif name == "cache_store":
+                prompt, context = _split_prompt_arguments(arguments)
                 await cache.store(
-                    prompt=arguments["prompt"],
+                    prompt=prompt,
                     response=arguments["response"],
                     user_id=arguments.get("user_id"),
                     tags=arguments.get("tags"),
-                    context=arguments.get("context"),
+                    context=context,
                 )
-                return [TextContent(type="text", text="Successfully stored in cache")]
+                return stored_reply
             
             elif name == "cache_clear":
                 await cache.clear()
-                return [TextContent(type="text", text="Cache cleared")]
+                return cleared_reply
             
             elif name == "invalidate_by_tag":
                 count = await cache.invalidate_by_tag(arguments["tag"])
@@ -269,53 +389,60 @@ def create_server() -> "Server":
                 return [TextContent(type="text", text=f"Invalidated {count} entries")]
             
             elif name == "batch_check":
-                results = await cache.batch_check(arguments["prompts"])
-                output = []
-                for prompt, result in zip(arguments["prompts"], results):
-                    status = "HIT" if result else "MISS"
-                    output.append(f"- {prompt[:50]}...: {status}")
-                return [TextContent(type="text", text="\n".join(output))]
+                prompts = arguments["prompts"]
+                user_id = arguments.get("user_id")
+                # One pipelined call; batch_check sends all L2 lookups together
+                results = await cache.batch_check(
+                    prompts,
+                    user_ids=[user_id] * len(prompts) if user_id else None,
+                )
+                text = "\n".join(
+                    f"- {prompt[:50] + '...' if len(prompt) > 50 else prompt}: {'HIT' if result else 'MISS'}"
+                    for prompt, result in zip(prompts, results)
+                )
+                return [TextContent(type="text", text=text)]
             
             else:
                 return [TextContent(type="text", text=f"Unknown tool: {name}")]
                 
         except Exception as e:
-            logger.error(f"Tool {name} failed: {e}")
+            logger.error("Tool %s failed: %s", name, e)
             return [TextContent(type="text", text=f"Error: {str(e)}")]
     
     # =========================================================================
     # RESOURCES
     # =========================================================================
     
+    # Built once; the list is identical for every request
+    resources = [
+        Resource(
+            uri="cache://metrics",
+            name="Cache Metrics",
+            description="Current cache performance metrics",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="cache://config",
+            name="Cache Configuration",
+            description="Current cache configuration",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="cache://health",
+            name="Cache Health",
+            description="Cache health status",
+            mimeType="application/json"
+        ),
+    ]
+    
     @server.list_resources()
     async def list_resources() -> List[Resource]:
         """List available cache resources."""
-        return [
-            Resource(
-                uri="cache://metrics",
-                name="Cache Metrics",
-                description="Current cache performance metrics",
-                mimeType="application/json"
-            ),
-            Resource(
-                uri="cache://config",
-                name="Cache Configuration",
-                description="Current cache configuration",
-                mimeType="application/json"
-            ),
-            Resource(
-                uri="cache://health",
-                name="Cache Health",
-                description="Cache health status",
-                mimeType="application/json"
-            ),
-        ]
+        return resources
     
     @server.read_resource()
     async def read_resource(uri: str) -> ResourceContents:
         """Read a cache resource."""
-        import json
-        
         cache = await get_cache_manager()
         
         if uri == "cache://metrics":
@@ -323,17 +450,15 @@ def create_server() -> "Server":
             return TextResourceContents(
                 uri=uri,
                 mimeType="application/json",
-                text=json.dumps(metrics, indent=2)
+                text=_to_json(metrics)
             )
         
         elif uri == "cache://config":
-            config = cache.config.model_dump()
-            # Remove sensitive data
-            config.pop("connection_kwargs", None)
+            # Sensitive connection_kwargs are already left out
             return TextResourceContents(
                 uri=uri,
                 mimeType="application/json",
-                text=json.dumps(config, indent=2, default=str)
+                text=cache.get_config_json()
             )
         
         elif uri == "cache://health":
@@ -352,7 +477,7 @@ def create_server() -> "Server":
             return TextResourceContents(
                 uri=uri,
                 mimeType="application/json",
-                text=json.dumps(health, indent=2)
+                text=_to_json(health)
             )
         
         else:
@@ -372,6 +497,13 @@ async def main():
     
     server = create_server()
     
+    # With warm prompts set, load the model before the first request arrives
+    if get_config_from_env().warm_prompts:
+        try:
+            await get_cache_manager()
+        except Exception as e:
+            logger.error("Eager cache initialization failed: %s", e)
+    
     try:
         async with stdio_server() as (read_stream, write_stream):
             await server.run(
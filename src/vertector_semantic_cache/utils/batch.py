@@ -1,10 +1,187 @@
 """Batch operations module for semantic cache."""
 
 import asyncio
+import hashlib
+import inspect
+import itertools
 from typing import List, Optional, Dict, Any, Tuple
 import time
+from weakref import WeakKeyDictionary, finalize
 
-async def batch_vectorize(texts: List[str], vectorizer) -> List[List[float]]:
+import numpy as np
+from cachetools import LRUCache
+
+# Embeddings keyed by (vectorizer serial, sha256(text)), shared across calls
+_EMBEDDING_CACHE_SIZE = 4096
+_embedding_cache: LRUCache = LRUCache(maxsize=_EMBEDDING_CACHE_SIZE)
+_embedding_cache_stats = {"hits": 0, "misses": 0}
+
+# id(vectorizer) -> serial, dropped when the vectorizer is collected. Model names
+# can't be used: every CustomTextVectorizer (including ONNX ones) is "custom".
+_vectorizer_serials: Dict[int, int] = {}
+_next_serial = itertools.count()
+
+
+def _vectorizer_serial(vectorizer) -> Optional[int]:
+    """Get a cache namespace unique to this vectorizer instance.
+    
+    Serials are never reused, so a new vectorizer that lands on a freed
+    id() can't see a collected one's rows. Returns None for objects that
+    can't be weakly referenced; their embeddings aren't cached.
+    """
+    vid = id(vectorizer)
+    serial = _vectorizer_serials.get(vid)
+    if serial is None:
+        try:
+            finalize(vectorizer, _vectorizer_serials.pop, vid, None)
+        except TypeError:
+            return None
+        serial = _vectorizer_serials[vid] = next(_next_serial)
+    return serial
+
+
+def embedding_cache_info() -> Dict[str, int]:
+    """Get hit/miss counts and size of the batch_vectorize embedding cache."""
+    return {
+        **_embedding_cache_stats,
+        "size": len(_embedding_cache),
+        "maxsize": _EMBEDDING_CACHE_SIZE,
+    }
+
+
+def clear_embedding_cache() -> None:
+    """Drop all cached embeddings and reset the counters."""
+    _embedding_cache.clear()
+    _embedding_cache_stats["hits"] = 0
+    _embedding_cache_stats["misses"] = 0
+
+
+# Vectorizer class -> (method name, is coroutine function), resolved once per class
+_EMBED_METHODS: "WeakKeyDictionary[type, Tuple[str, bool]]" = WeakKeyDictionary()
+
+
+def _resolve_embed_method(vectorizer) -> Tuple[str, bool]:
+    """Pick the batch method to use for the vectorizer's class."""
+    cls = type(vectorizer)
+    resolved = _EMBED_METHODS.get(cls)
+    if resolved is None:
+        # Hand the whole list over in one call rather than one call per text
+        for name in ("embed_many", "aembed_many", "aembed", "embed"):
+            method = getattr(vectorizer, name, None)
+            if method is not None:
+                resolved = (name, inspect.iscoroutinefunction(method))
+                break
+        else:
+            raise TypeError(f"{cls.__name__} has no embed method")
+        _EMBED_METHODS[cls] = resolved
+    return resolved
+
+
+async def _embed_texts(texts: List[str], vectorizer) -> List[List[float]]:
+    """Embed texts with whichever batch method the vectorizer provides."""
+    name, is_async = _resolve_embed_method(vectorizer)
+    method = getattr(vectorizer, name)
+    if is_async:
+        return await method(texts)
+    # Sync encoders run on a worker thread so the event loop keeps serving
+    return await asyncio.to_thread(method, texts)
+
+
+# How often the batcher checks for more texts while its window is open
+_POLL_SECONDS = 0.0005
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into shared batches.
+    
+    Texts submitted from concurrent callers are collected for up to
+    ``window_seconds`` (or until ``max_batch`` texts are queued) and sent
+    to the vectorizer in one batch call. The worker task starts on first
+    use; call ``close()`` when done.
+    """
+    
+    def __init__(self, vectorizer, max_batch: int = 64, window_seconds: float = 0.005):
+        """
+        Initialize the batcher.
+        
+        Args:
+            vectorizer: Vectorizer instance
+            max_batch: Maximum texts per vectorizer call
+            window_seconds: How long to wait for more texts after the first
+        """
+        self.vectorizer = vectorizer
+        self.max_batch = max_batch
+        self.window_seconds = window_seconds
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+    
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts, sharing batches with other callers."""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+    
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the window closes."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.window_seconds
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            # Poll rather than wait_for(get()): before 3.12 a timeout racing
+            # a completed get() drops the item and its caller hangs
+            await asyncio.sleep(min(timeout, _POLL_SECONDS))
+        return batch
+    
+    async def _run(self) -> None:
+        """Embed queued texts batch by batch until cancelled."""
+        while True:
+            batch = await self._collect()
+            try:
+                results = await _embed_texts([text for text, _ in batch], self.vectorizer)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), embedding in zip(batch, results):
+                if not future.done():
+                    future.set_result(embedding)
+    
+    async def close(self) -> None:
+        """Stop the worker and cancel requests still waiting."""
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+
+async def batch_vectorize(
+    texts: List[str],
+    vectorizer,
+    batcher: Optional[EmbeddingBatcher] = None,
+) -> np.ndarray:
     """
     Batch vectorize multiple texts efficiently.
     
@@ -12,29 +189,51 @@ async def batch_vectorize(texts: List[str], vectorizer) -> List[List[float]]:
     - Single model forward pass
     - GPU batching if available
     - Better throughput
+    - Repeated texts, within the batch or across calls, are embedded once
     
     Args:
         texts: List of texts to vectorize
         vectorizer: Vectorizer instance
+        batcher: Optional batcher for the same vectorizer; uncached texts
+            are then embedded together with concurrent callers' texts
         
     Returns:
-        List of embedding vectors
+        Contiguous float32 array of shape (len(texts), dim), one row per text
     """
-    # Most vectorizers don't have true async support
-    # But batching them is still beneficial
-    
-    # For now, use the vectorizer's embed method if it supports lists
-    if hasattr(vectorizer, 'embed_many'):
-        return await vectorizer.embed_many(texts)
-    elif hasattr(vectorizer, 'aembed_many'):
-        return await vectorizer.aembed_many(texts)
-    else:
-        # Fall back to sequential (still better than calling check() N times)
-        embeddings = []
-        for text in texts:
-            if hasattr(vectorizer, 'aembed'):
-                embedding = await vectorizer.aembed([text])
-            else:
-                embedding = vectorizer.embed([text])
-            embeddings.append(embedding[0] if embedding else [])
-        return embeddings
+    serial = _vectorizer_serial(vectorizer)
+    use_cache = serial is not None
+    
+    embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+    # Cache key -> (text, positions) for texts not in the cache
+    pending: Dict[Tuple[Any, bytes], Tuple[str, List[int]]] = {}
+    
+    for i, text in enumerate(texts):
+        key = (serial, hashlib.sha256(text.encode()).digest())
+        cached = _embedding_cache.get(key) if use_cache else None
+        if cached is not None:
+            embeddings[i] = cached
+            _embedding_cache_stats["hits"] += 1
+        elif key in pending:
+            pending[key][1].append(i)
+            _embedding_cache_stats["hits"] += 1
+        else:
+            pending[key] = (text, [i])
+            _embedding_cache_stats["misses"] += 1
+    
+    if pending:
+        unique_texts = [text for text, _ in pending.values()]
+        if batcher is not None:
+            results = await batcher.embed_many(unique_texts)
+        else:
+            results = await _embed_texts(unique_texts, vectorizer)
+        for (key, (_, positions)), embedding in zip(pending.items(), results):
+            row = np.asarray(embedding, dtype=np.float32)
+            if use_cache:
+                _embedding_cache[key] = row
+            for i in positions:
+                embeddings[i] = row
+    
+    if not embeddings:
+        return np.empty((0, 0), dtype=np.float32)
+    # np.stack copies, so callers never alias cached rows
+    return np.stack(embeddings)
@@ -1,5 +1,6 @@
 """Vectorizer module."""
 
 from vertector_semantic_cache.vectorizers.factory import VectorizerFactory
+from vertector_semantic_cache.vectorizers.quantized import QuantizedVectorizerWrapper
 
-__all__ = ["VectorizerFactory"]
+__all__ = ["VectorizerFactory", "QuantizedVectorizerWrapper"]
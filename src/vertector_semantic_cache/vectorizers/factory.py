@@ -12,6 +12,8 @@ from redisvl.utils.vectorize import (
 )
 
 from vertector_semantic_cache.core.config import VectorizerConfig
+from vertector_semantic_cache.vectorizers.onnx import create_onnx_vectorizer
+from vertector_semantic_cache.vectorizers.quantized import QuantizedVectorizerWrapper
 from vertector_semantic_cache.utils.exceptions import VectorizerError
 from vertector_semantic_cache.utils.logging import get_logger
 
@@ -38,45 +40,53 @@ class VectorizerFactory:
         try:
             logger.info(f"Creating {config.provider} vectorizer with model: {config.model}")
             
+            # INT8 is produced by quantizing a float32 model's output
+            quantize = config.dtype == "int8"
+            dtype = "float32" if quantize else config.dtype
+            
             if config.provider == "huggingface":
-                return HFTextVectorizer(
+                vectorizer = HFTextVectorizer(
                     model=config.model,
-                    dtype=config.dtype,
+                    dtype=dtype,
+                    device=config.device or VectorizerFactory._detect_device(),
                 )
             
+            elif config.provider == "onnx":
+                vectorizer = create_onnx_vectorizer(config.model, dtype=dtype)
+            
             elif config.provider == "openai":
                 api_config = config.api_config or {}
-                return OpenAITextVectorizer(
+                vectorizer = OpenAITextVectorizer(
                     model=config.model,
                     api_config=api_config,
-                    dtype=config.dtype,
+                    dtype=dtype,
                     dims=config.dims,
                 )
             
             elif config.provider == "cohere":
                 api_config = config.api_config or {}
-                return CohereTextVectorizer(
+                vectorizer = CohereTextVectorizer(
                     model=config.model,
                     api_config=api_config,
-                    dtype=config.dtype,
+                    dtype=dtype,
                     dims=config.dims,
                 )
             
             elif config.provider == "vertexai":
                 api_config = config.api_config or {}
-                return VertexAITextVectorizer(
+                vectorizer = VertexAITextVectorizer(
                     model=config.model,
                     api_config=api_config,
-                    dtype=config.dtype,
+                    dtype=dtype,
                     dims=config.dims,
                 )
             
             elif config.provider == "voyageai":
                 api_config = config.api_config or {}
-                return VoyageAITextVectorizer(
+                vectorizer = VoyageAITextVectorizer(
                     model=config.model,
                     api_config=api_config,
-                    dtype=config.dtype,
+                    dtype=dtype,
                     dims=config.dims,
                 )
             
@@ -88,12 +98,30 @@ class VectorizerFactory:
             
             else:
                 raise VectorizerError(f"Unknown vectorizer provider: {config.provider}")
+            
+            if quantize:
+                return QuantizedVectorizerWrapper(vectorizer)
+            return vectorizer
         
         except Exception as e:
             logger.error(f"Failed to create vectorizer: {e}")
             raise VectorizerError(f"Vectorizer creation failed: {e}") from e
     
+    @staticmethod
+    def _detect_device() -> str:
+        """Pick the fastest available torch device: CUDA, then MPS, then CPU."""
+        try:
+            import torch
+            
+            if torch.cuda.is_available():
+                return "cuda"
+            if torch.backends.mps.is_available():
+                return "mps"
+        except Exception:
+            pass
+        return "cpu"
+    
     @staticmethod
     def get_available_providers() -> list[str]:
         """Get list of available vectorizer providers."""
-        return ["huggingface", "openai", "cohere", "vertexai", "voyageai", "custom"]
+        return ["huggingface", "onnx", "openai", "cohere", "vertexai", "voyageai", "custom"]
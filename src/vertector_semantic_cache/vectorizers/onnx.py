@@ -0,0 +1,75 @@
+"""ONNX Runtime vectorizer for HuggingFace sentence-embedding models."""
+
+import os
+from typing import List
+
+import numpy as np
+from redisvl.utils.vectorize import CustomTextVectorizer
+
+from vertector_semantic_cache.utils.exceptions import VectorizerError
+from vertector_semantic_cache.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def create_onnx_vectorizer(model: str, dtype: str = "float32") -> CustomTextVectorizer:
+    """
+    Load a HuggingFace model into ONNX Runtime and wrap it as a vectorizer.
+    
+    The model is exported to ONNX on load and run with all graph
+    optimizations enabled, on CUDA when available. Embeddings are
+    mean-pooled over the attention mask and L2-normalized, matching
+    sentence-transformers models.
+    
+    Args:
+        model: HuggingFace model name or path
+        dtype: Data type for embeddings
+        
+    Returns:
+        Vectorizer backed by ONNX Runtime
+        
+    Raises:
+        VectorizerError: If optimum/onnxruntime are not installed
+    """
+    try:
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+    except ImportError as e:
+        raise VectorizerError(
+            "ONNX vectorizer requires optimum with onnxruntime. "
+            "Install with: pip install 'vertector-semantic-cache[onnx]'"
+        ) from e
+    
+    session_options = ort.SessionOptions()
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session_options.intra_op_num_threads = os.cpu_count() or 1
+    
+    provider = (
+        "CUDAExecutionProvider"
+        if "CUDAExecutionProvider" in ort.get_available_providers()
+        else "CPUExecutionProvider"
+    )
+    logger.info(f"Loading ONNX model {model} on {provider}")
+    
+    ort_model = ORTModelForFeatureExtraction.from_pretrained(
+        model,
+        export=True,
+        provider=provider,
+        session_options=session_options,
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    
+    def embed_many(texts: List[str], **kwargs) -> List[List[float]]:
+        # Tokenize the whole batch once and run a single forward pass
+        inputs = tokenizer(texts, padding=True, truncation=True, return_tensors="np")
+        hidden = np.asarray(ort_model(**inputs).last_hidden_state, dtype=np.float32)
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.tolist()
+    
+    def embed(text: str, **kwargs) -> List[float]:
+        return embed_many([text])[0]
+    
+    return CustomTextVectorizer(embed=embed, embed_many=embed_many, dtype=dtype)
@@ -0,0 +1,63 @@
+"""INT8 quantization wrapper for vectorizers."""
+
+from typing import Any, List
+
+import numpy as np
+from pydantic import PrivateAttr
+from redisvl.utils.vectorize import BaseVectorizer
+
+
+def quantize_int8(embeddings: Any) -> np.ndarray:
+    """Scale each vector so its largest component maps to +/-127 and round.
+    
+    The scale is per vector; cosine similarity ignores vector length, so
+    it does not need to be stored.
+    
+    Args:
+        embeddings: 2-D array-like of float embeddings
+        
+    Returns:
+        int8 array of the same shape
+    """
+    x = np.asarray(embeddings, dtype=np.float32)
+    scale = np.abs(x).max(axis=-1, keepdims=True) / 127.0
+    scale[scale == 0] = 1.0
+    return np.round(x / scale).astype(np.int8)
+
+
+class QuantizedVectorizerWrapper(BaseVectorizer):
+    """Wrap a float vectorizer and emit INT8 embeddings.
+    
+    Vectors are a quarter the size of float32 in Redis, which cuts memory
+    and the bytes scanned per vector search. Use with cosine distance.
+    """
+    
+    _base: BaseVectorizer = PrivateAttr()
+    
+    def __init__(self, base: BaseVectorizer, **kwargs):
+        """
+        Initialize the wrapper.
+        
+        Args:
+            base: Vectorizer producing float embeddings
+        """
+        super().__init__(model=base.model, dtype="int8", dims=base.dims, **kwargs)
+        self._base = base
+    
+    @property
+    def type(self) -> str:
+        return f"int8-{self._base.type}"
+    
+    def _embed(self, text: str, **kwargs) -> List[int]:
+        return quantize_int8([self._base.embed(text, **kwargs)])[0].tolist()
+    
+    def _embed_many(self, texts: List[str], batch_size: int = 10, **kwargs) -> List[List[int]]:
+        embeddings = self._base.embed_many(texts, batch_size=batch_size, **kwargs)
+        return quantize_int8(embeddings).tolist()
+    
+    async def _aembed(self, text: str, **kwargs) -> List[int]:
+        return quantize_int8([await self._base.aembed(text, **kwargs)])[0].tolist()
+    
+    async def _aembed_many(self, texts: List[str], batch_size: int = 10, **kwargs) -> List[List[int]]:
+        embeddings = await self._base.aembed_many(texts, batch_size=batch_size, **kwargs)
+        return quantize_int8(embeddings).tolist()
@@ -0,0 +1,128 @@
+"""Tests for batch embedding helpers."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from vertector_semantic_cache.utils.batch import (
+    EmbeddingBatcher,
+    batch_vectorize,
+    clear_embedding_cache,
+    embedding_cache_info,
+)
+
+
+class FakeVectorizer:
+    """Sync vectorizer that embeds text as [len(text), scale] and counts calls."""
+
+    def __init__(self, scale: float = 1.0, model: str = "custom"):
+        self.model = model
+        self.dtype = "float32"
+        self.scale = scale
+        self.calls = []
+
+    def embed_many(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), self.scale] for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_embedding_cache()
+    yield
+    clear_embedding_cache()
+
+
+async def test_batch_vectorize_dedupes_within_call():
+    vectorizer = FakeVectorizer()
+
+    result = await batch_vectorize(["a", "bb", "a"], vectorizer)
+
+    assert vectorizer.calls == [["a", "bb"]]
+    assert result.dtype == np.float32
+    np.testing.assert_array_equal(result, [[1, 1], [2, 1], [1, 1]])
+
+
+async def test_batch_vectorize_reuses_cache_across_calls():
+    vectorizer = FakeVectorizer()
+
+    await batch_vectorize(["a", "bb"], vectorizer)
+    await batch_vectorize(["bb", "ccc"], vectorizer)
+
+    assert vectorizer.calls == [["a", "bb"], ["ccc"]]
+    assert embedding_cache_info()["size"] == 3
+
+
+async def test_batch_vectorize_keeps_custom_vectorizers_apart():
+    """Two vectorizers with the same generic model name don't share rows."""
+    first = FakeVectorizer(scale=1.0)
+    second = FakeVectorizer(scale=2.0)
+
+    a = await batch_vectorize(["same text"], first)
+    b = await batch_vectorize(["same text"], second)
+
+    assert second.calls == [["same text"]]
+    np.testing.assert_array_equal(a, [[9, 1]])
+    np.testing.assert_array_equal(b, [[9, 2]])
+
+
+async def test_batch_vectorize_empty():
+    result = await batch_vectorize([], FakeVectorizer())
+
+    assert result.shape == (0, 0)
+
+
+async def test_batcher_coalesces_concurrent_embeds_within_window():
+    vectorizer = FakeVectorizer()
+    batcher = EmbeddingBatcher(vectorizer, max_batch=64, window_seconds=0.02)
+
+    async def embed_later(text, delay):
+        await asyncio.sleep(delay)
+        return await batcher.embed(text)
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(embed_later("x" * n, n * 0.001) for n in range(1, 11))),
+            timeout=2,
+        )
+    finally:
+        await batcher.close()
+
+    assert results == [[float(n), 1.0] for n in range(1, 11)]
+    assert sum(len(call) for call in vectorizer.calls) == 10
+    assert len(vectorizer.calls) == 1
+
+
+async def test_batcher_splits_at_max_batch():
+    vectorizer = FakeVectorizer()
+    batcher = EmbeddingBatcher(vectorizer, max_batch=4, window_seconds=0.01)
+
+    try:
+        results = await asyncio.wait_for(
+            batcher.embed_many(["x" * n for n in range(1, 11)]), timeout=2
+        )
+    finally:
+        await batcher.close()
+
+    assert results == [[float(n), 1.0] for n in range(1, 11)]
+    assert [len(call) for call in vectorizer.calls] == [4, 4, 2]
+
+
+async def test_batcher_many_waves_all_resolve():
+    """Embeds arriving throughout and after each window all complete."""
+    vectorizer = FakeVectorizer()
+    batcher = EmbeddingBatcher(vectorizer, max_batch=8, window_seconds=0.002)
+
+    async def embed_later(i):
+        await asyncio.sleep((i % 7) * 0.0007)
+        return await batcher.embed("x" * (i % 5 + 1))
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(embed_later(i) for i in range(200))), timeout=5
+        )
+    finally:
+        await batcher.close()
+
+    assert results == [[float(i % 5 + 1), 1.0] for i in range(200)]
@@ -0,0 +1,179 @@
+"""Tests for the in-memory L1 cache."""
+
+import threading
+import time
+
+import pytest
+
+from vertector_semantic_cache.core import l1_cache
+from vertector_semantic_cache.core.l1_cache import L1Cache, L1CacheEntry
+
+
+def _entry(response="r", age_seconds=0.0):
+    return L1CacheEntry(
+        response=response,
+        metadata=None,
+        cached_at_ns=time.time_ns() - int(age_seconds * 1e9),
+    )
+
+
+def _sweeper_threads():
+    return [t for t in threading.enumerate() if t.name == "l1-ttl-sweeper"]
+
+
+def test_unknown_strategy_raises():
+    with pytest.raises(ValueError):
+        L1Cache(strategy="fifo")
+
+
+def test_max_size_is_spread_across_shards():
+    cache = L1Cache(max_size=10, shards=4)
+
+    assert [shard.maxsize for shard in cache._shards] == [3, 3, 2, 2]
+
+
+def test_default_shard_count_keeps_shards_large_enough():
+    assert L1Cache(max_size=100)._num_shards == 1
+    assert L1Cache(max_size=10_000)._num_shards >= 1
+
+
+@pytest.mark.parametrize("strategy", ["lru", "lfu"])
+def test_eviction_is_per_shard(strategy):
+    cache = L1Cache(max_size=4, strategy=strategy, shards=2)
+    # Integer keys hash to themselves: even keys go to shard 0, odd to shard 1
+    for key in (0, 2, 4):
+        cache.set(key, _entry(str(key)))
+    cache.set(1, _entry("1"))
+
+    assert len(cache) == 3
+    assert cache.get(0) is None
+    assert cache.get(4).response == "4"
+    assert cache.get(1).response == "1"
+
+
+def test_lru_hit_refreshes_recency():
+    cache = L1Cache(max_size=2, shards=1)
+    cache.set("a", _entry("a"))
+    cache.set("b", _entry("b"))
+    cache.get("a")
+    cache.set("c", _entry("c"))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+
+def test_get_many_across_shards_preserves_order():
+    cache = L1Cache(max_size=64, shards=4)
+    for key in range(8):
+        cache.set(key, _entry(str(key)))
+
+    entries = cache.get_many([7, 100, 0, 5, 2, 101])
+
+    assert [e.response if e else None for e in entries] == ["7", None, "0", "5", "2", None]
+
+
+def test_invalidate_and_clear():
+    cache = L1Cache(max_size=64, shards=4)
+    for key in range(4):
+        cache.set(key, _entry())
+
+    cache.invalidate(1)
+    assert cache.get(1) is None
+    assert len(cache) == 3
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_offer_admission(monkeypatch):
+    always = L1Cache(max_size=64, shards=1, admission_probability=1.0)
+    never = L1Cache(max_size=64, shards=1, admission_probability=0.0)
+
+    assert always.offer("a", _entry())
+    assert not never.offer("a", _entry())
+    assert never.get("a") is None
+
+    half = L1Cache(max_size=64, shards=1, admission_probability=0.5)
+    monkeypatch.setattr(l1_cache.random, "random", lambda: 0.7)
+    assert not half.offer("a", _entry())
+    monkeypatch.setattr(l1_cache.random, "random", lambda: 0.3)
+    assert half.offer("a", _entry())
+    assert half.get("a") is not None
+
+
+def test_access_count_counts_hits_only():
+    cache = L1Cache(max_size=64, shards=2, track_access=True)
+    cache.set(0, _entry())
+
+    cache.get(0)
+    cache.get_many([0, 2])
+    cache.get(2)  # miss
+
+    assert cache.access_count(0) == 2
+    assert cache.access_count(2) == 0
+
+
+def test_access_count_is_shared_within_a_slot():
+    cache = L1Cache(max_size=64, shards=2, track_access=True)
+    # Same shard and slot: keys differ by num_shards * _ACCESS_SLOTS
+    other = 2 * l1_cache._ACCESS_SLOTS
+    cache.set(0, _entry())
+
+    cache.get(0)
+
+    assert cache.access_count(other) == 1
+
+
+def test_access_count_disabled():
+    cache = L1Cache(max_size=64, shards=1)
+    cache.set("a", _entry())
+    cache.get("a")
+
+    assert cache.access_count("a") == 0
+
+
+def test_ttl_expires_entries_on_lookup():
+    cache = L1Cache(max_size=64, ttl_seconds=10, strategy="ttl", shards=2)
+    try:
+        cache.set(0, _entry("old", age_seconds=11))
+        cache.set(1, _entry("old", age_seconds=11))
+        cache.set(2, _entry("new"))
+
+        assert cache.get(0) is None
+        assert [e.response if e else None for e in cache.get_many([1, 2])] == [None, "new"]
+        assert len(cache) == 1
+    finally:
+        cache.close()
+
+
+def test_sweep_drops_expired_entries():
+    cache = L1Cache(max_size=64, ttl_seconds=10, strategy="ttl", shards=2)
+    try:
+        for key in range(4):
+            cache.set(key, _entry(age_seconds=11 if key % 2 else 0))
+
+        cache._sweep()
+
+        assert len(cache) == 2
+        assert cache.get(0) is not None
+    finally:
+        cache.close()
+
+
+def test_close_stops_sweeper_thread():
+    before = set(_sweeper_threads())
+    cache = L1Cache(max_size=64, ttl_seconds=1, strategy="ttl", shards=1)
+    started = [t for t in _sweeper_threads() if t not in before]
+    assert len(started) == 1
+
+    cache.close()
+    started[0].join(timeout=2)
+
+    assert not started[0].is_alive()
+
+
+def test_non_ttl_strategies_have_no_sweeper():
+    cache = L1Cache(max_size=64, strategy="lru")
+
+    assert getattr(cache, "_sweeper_stop", None) is None
+    cache.close()
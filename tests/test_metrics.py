@@ -0,0 +1,80 @@
+"""Tests for cache metrics."""
+
+import asyncio
+
+import pytest
+
+from vertector_semantic_cache.core.metrics import CacheMetrics, LogLinearHistogram
+
+
+def test_histogram_counts_value_on_bucket_bound():
+    """A value exactly on a bound is counted in that le bucket."""
+    hist = LogLinearHistogram()
+    hist.record(10.0)
+    
+    assert hist.cumulative_counts([5, 10, 50]) == [0, 1, 1]
+
+
+def test_histogram_counts_values_between_bounds():
+    """Values just either side of a bound land in the expected buckets."""
+    hist = LogLinearHistogram()
+    hist.record(9.99)
+    hist.record(10.01)
+    
+    assert hist.cumulative_counts([5, 10, 50]) == [0, 1, 2]
+
+
+def test_counters_accept_assignment_and_augmented_assignment():
+    """Counters stay assignable like the former dataclass fields."""
+    metrics = CacheMetrics(cache_hits=3, l1_hits=2)
+    metrics.cache_hits += 2
+    metrics.l1_misses = 1
+    metrics.total_latency_saved = 1.5
+    
+    assert metrics.cache_hits == 5
+    assert metrics.l1_hits == 2
+    assert metrics.to_dict()["l1_cache"]["hit_rate_percentage"] == 66.67
+    assert metrics.total_latency_saved == 1.5
+
+
+def test_unknown_or_derived_init_kwargs_raise():
+    with pytest.raises(TypeError):
+        CacheMetrics(bogus=1)
+    with pytest.raises(TypeError):
+        CacheMetrics(hit_rate=0.5)
+
+
+def test_latency_lists_are_deprecated_seconds():
+    metrics = CacheMetrics()
+    metrics.record_l1_hit(0.002)
+    metrics.record_l1_hit(0.004)
+    
+    with pytest.warns(DeprecationWarning):
+        latencies = metrics.l1_latencies
+    
+    assert latencies == pytest.approx([0.002, 0.004])
+
+
+async def test_iter_prometheus_yields_to_event_loop():
+    """Other tasks run while a large export is streamed."""
+    metrics = CacheMetrics()
+    for i in range(100):
+        metrics.record_tag_invalidation(f"tag{i}", 1)
+    ticks = 0
+    
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+    
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    try:
+        # Consume without awaiting anything else
+        chunks = [chunk async for chunk in metrics.iter_prometheus()]
+    finally:
+        task.cancel()
+    
+    assert b"".join(chunks).decode() == metrics.to_prometheus() + "\n"
+    assert ticks > 100
@@ -0,0 +1,161 @@
+"""Tests for the negative (known-miss) cache."""
+
+import pytest
+
+from vertector_semantic_cache import AsyncSemanticCacheManager, CacheConfig
+from vertector_semantic_cache.core import negative_cache
+from vertector_semantic_cache.core.negative_cache import NegativeCache
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(negative_cache.time, "monotonic", fake)
+    return fake
+
+
+def test_add_and_contains(clock):
+    cache = NegativeCache(capacity=100, ttl_seconds=60)
+    cache.add(("prompt", None, None))
+
+    assert cache.contains(("prompt", None, None))
+    assert not cache.contains(("other", None, None))
+    assert len(cache) == 1
+
+
+def test_miss_survives_one_rotation_and_expires_after_two(clock):
+    cache = NegativeCache(capacity=100, ttl_seconds=60)
+    cache.add("a")
+
+    clock.now += 61
+    assert cache.contains("a")  # rotated into the previous generation
+
+    clock.now += 61
+    assert not cache.contains("a")
+    assert len(cache) == 0
+
+
+def test_idle_for_two_ttls_drops_both_generations(clock):
+    cache = NegativeCache(capacity=100, ttl_seconds=60)
+    cache.add("a")
+
+    clock.now += 121
+
+    assert not cache.contains("a")
+
+
+def test_rotates_at_half_capacity(clock):
+    cache = NegativeCache(capacity=4, ttl_seconds=60)
+    cache.add("a")
+    cache.add("b")  # current generation now full (capacity // 2)
+    cache.add("c")  # rotates: a, b move to previous
+    cache.add("d")
+    cache.add("e")  # rotates again: a, b are dropped
+
+    assert not cache.contains("a")
+    assert not cache.contains("b")
+    assert all(cache.contains(key) for key in ("c", "d", "e"))
+    assert len(cache) == 3
+
+
+def test_clear(clock):
+    cache = NegativeCache(capacity=100, ttl_seconds=60)
+    cache.add("a")
+    clock.now += 61
+    cache.add("b")
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert not cache.contains("a")
+
+
+class FakeSemanticCache:
+    """Minimal stand-in for the Redis-backed SemanticCache."""
+
+    def __init__(self):
+        self.threshold = None
+
+    async def astore(self, **kwargs):
+        return "cache:1"
+
+    async def aclear(self):
+        pass
+
+    async def adelete(self):
+        pass
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+
+
+@pytest.fixture
+def manager():
+    config = CacheConfig(negative_cache={"enabled": True})
+    manager = AsyncSemanticCacheManager(config)
+    manager._negative_cache = NegativeCache()
+    manager._cache = FakeSemanticCache()
+    manager._initialized = True
+
+    # Every L2 lookup misses
+    async def _miss(operation):
+        return []
+
+    manager._retry_operation = _miss
+    return manager
+
+
+async def test_repeated_miss_is_served_by_negative_cache(manager):
+    assert await manager.check("q") is None
+    assert await manager.check("q") is None
+
+    assert manager.metrics.negative_cache_hits == 1
+    assert manager.metrics.l2_misses == 1
+
+
+async def test_filters_bypass_negative_cache(manager):
+    assert await manager.check("q", filters={"lang": "en"}) is None
+    assert len(manager._negative_cache) == 0
+
+    await manager.check("q")
+    assert await manager.check("q", filters={"lang": "en"}) is None
+
+    assert manager.metrics.negative_cache_hits == 0
+    assert manager.metrics.l2_misses == 3
+
+
+@pytest.mark.parametrize(
+    "flush",
+    [
+        lambda m: m.store("q", "response"),
+        lambda m: m.clear(),
+        lambda m: m.delete(),
+    ],
+    ids=["store", "clear", "delete"],
+)
+async def test_writes_flush_negative_cache(manager, flush):
+    await manager.check("q")
+    assert len(manager._negative_cache) == 1
+
+    await flush(manager)
+
+    assert len(manager._negative_cache) == 0
+
+
+async def test_set_threshold_flushes_negative_cache(manager):
+    await manager.check("q")
+
+    manager.set_threshold(0.2)
+
+    assert len(manager._negative_cache) == 0
+    assert manager._cache.threshold == 0.2
@@ -0,0 +1,77 @@
+"""Tests for tag-based invalidation."""
+
+import pytest
+
+from vertector_semantic_cache.core import tag_manager
+from vertector_semantic_cache.core.tag_manager import TagManager
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+@pytest.fixture
+async def redis_client():
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
+async def _store(redis_client, *keys):
+    for key in keys:
+        await redis_client.hset(key, mapping={"response": "r"})
+
+
+async def test_add_tags_single_and_multiple(redis_client):
+    manager = TagManager(redis_client)
+
+    await manager.add_tags("cache:1", ["a"])
+    await manager.add_tags(["cache:2", "cache:3"], ["a", "b"])
+
+    assert await redis_client.smembers("tag:a") == {b"cache:1", b"cache:2", b"cache:3"}
+    assert await redis_client.smembers("tag:b") == {b"cache:2", b"cache:3"}
+
+
+async def test_invalidate_by_tag_deletes_members_and_set(redis_client):
+    manager = TagManager(redis_client)
+    await _store(redis_client, "cache:1", "cache:2", "cache:3")
+    await manager.add_tags(["cache:1", "cache:2"], ["a"])
+
+    deleted = await manager.invalidate_by_tag("a")
+
+    assert deleted == 2
+    assert await redis_client.exists("cache:1", "cache:2", "tag:a") == 0
+    assert await redis_client.exists("cache:3") == 1
+
+
+async def test_invalidate_by_tag_unknown_tag(redis_client):
+    manager = TagManager(redis_client)
+
+    assert await manager.invalidate_by_tag("missing") == 0
+
+
+async def test_invalidate_large_tag_uses_sscan_path(redis_client, monkeypatch):
+    monkeypatch.setattr(tag_manager, "_LUA_MAX_MEMBERS", 3)
+    monkeypatch.setattr(tag_manager, "_BATCH_SIZE", 2)
+    manager = TagManager(redis_client)
+    keys = [f"cache:{i}" for i in range(7)]
+    await _store(redis_client, *keys)
+    await manager.add_tags(keys, ["big"])
+
+    deleted = await manager.invalidate_by_tag("big")
+
+    assert deleted == 7
+    assert await redis_client.exists(*keys, "tag:big") == 0
+
+
+async def test_invalidate_by_tags_union_and_intersection(redis_client):
+    manager = TagManager(redis_client)
+    await _store(redis_client, "cache:1", "cache:2", "cache:3")
+    await manager.add_tags(["cache:1", "cache:2"], ["a"])
+    await manager.add_tags(["cache:2", "cache:3"], ["b"])
+
+    assert await manager.invalidate_by_tags(["a", "b"], match_all=True) == 1
+    assert await redis_client.exists("cache:2") == 0
+
+    assert await manager.invalidate_by_tags(["a", "b"]) == 2
+    assert await redis_client.exists("cache:1", "cache:3") == 0
+    assert await redis_client.keys("tag:__tmp:*") == []